@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Selective supersampling and level of detail for Kansyl icon layers
+Only layers with thin or diagonal geometry are drawn at a higher resolution
+and reduced back down; everything else is drawn once at the target size
+
+Layers can also declare the smallest icon they are worth drawing at and a
+simpler layer to draw instead below that size (or nothing at all).
+"""
+
+import os
+import time
+
+# Check if Pillow is installed
+try:
+    from PIL import Image, ImageChops, ImageDraw, ImageStat
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image, ImageChops, ImageDraw, ImageStat
+
+# Supersampling factors to try, best first
+AA_FACTORS = (4, 3, 2)
+
+# Pixel budget for one icon's supersampled canvases (about 12 megapixels).
+# Small icons get 4x; the 1024px App Store icon drops to 2x or 3x, where
+# jagged edges are a fraction of a percent of the image anyway.
+DEFAULT_AA_BUDGET = 12_000_000
+
+class Layer:
+    """One drawing step of an icon
+
+    draw_fn(draw, size, k) draws the layer for a logical icon size onto a
+    canvas that is k times larger, so every coordinate, radius and line
+    width it uses must be multiplied by k. Set antialias for layers with
+    thin lines, curves or diagonals; axis-aligned fills and text (which
+    FreeType already smooths) don't need it.
+
+    Below min_size pixels the layer is replaced by fallback, another Layer
+    with its own min_size and fallback, or skipped when fallback is None.
+    """
+
+    def __init__(self, name, draw_fn, antialias=False, min_size=0, fallback=None):
+        self.name = name
+        self.draw_fn = draw_fn
+        self.antialias = antialias
+        self.min_size = min_size
+        self.fallback = fallback
+
+def resolve_lod(size, layers):
+    """The layers to draw at a size, with fallbacks substituted and skips removed"""
+    resolved = []
+    for layer in layers:
+        while layer is not None and size < layer.min_size:
+            layer = layer.fallback
+        if layer is not None:
+            resolved.append(layer)
+    return resolved
+
+def lod_thresholds(layers):
+    """Every min_size in the layers and their fallback chains, ascending"""
+    thresholds = set()
+    for layer in layers:
+        while layer is not None:
+            if layer.min_size > 0:
+                thresholds.add(layer.min_size)
+            layer = layer.fallback
+    return sorted(thresholds)
+
+def lod_tier(size, layers):
+    """Label of the size range that resolves to the same layers (e.g. 48-119px)"""
+    lower = 0
+    for threshold in lod_thresholds(layers):
+        if size < threshold:
+            return f"<{threshold}px" if lower == 0 else f"{lower}-{threshold - 1}px"
+        lower = threshold
+    return f">={lower}px" if lower else "all"
+
+def _runs(layers):
+    """Group consecutive layers that share the same antialias setting"""
+    runs = []
+    for layer in layers:
+        if runs and runs[-1][0] == layer.antialias:
+            runs[-1][1].append(layer)
+        else:
+            runs.append((layer.antialias, [layer]))
+    return runs
+
+def choose_factor(size, layers, budget=DEFAULT_AA_BUDGET):
+    """Pick the largest supersampling factor that fits the pixel budget
+
+    Each run of antialiased layers shares one canvas of (size * k)^2 pixels.
+    """
+    aa_runs = sum(1 for antialias, _ in _runs(layers) if antialias)
+    if aa_runs == 0:
+        return 1
+    for k in AA_FACTORS:
+        if aa_runs * (size * k) ** 2 <= budget:
+            return k
+    return 1
+
+def _draw_canvas(size, layers, k, timings=None):
+    """Draw layers onto one transparent canvas and reduce it to size"""
+    canvas = Image.new('RGBA', (size * k, size * k), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(canvas)
+    for layer in layers:
+        start = time.perf_counter()
+        layer.draw_fn(draw, size, k)
+        if timings is not None:
+            timings[layer.name] = time.perf_counter() - start
+
+    if k == 1:
+        return canvas
+    # Reduce in premultiplied alpha so transparent pixels don't darken edges
+    return canvas.convert('RGBa').reduce(k).convert('RGBA')
+
+def _edge_change(size, layer, k):
+    """Mean alpha change (0-100%) between the plain and supersampled layer"""
+    plain = _draw_canvas(size, [layer], 1).getchannel('A')
+    smooth = _draw_canvas(size, [layer], k).getchannel('A')
+    return ImageStat.Stat(ImageChops.difference(plain, smooth)).mean[0] / 2.55
+
+def render_layers(size, layers, budget=DEFAULT_AA_BUDGET, report=None, lod=True):
+    """Render layers in order into one RGBA image of the given size
+
+    With lod, layers below their min_size are substituted or skipped
+    (see Layer). If report is a list, one dict per drawn layer is appended
+    to it with the factor used, the draw and reduce time in milliseconds,
+    and for antialiased layers how much the edges changed versus a plain
+    render.
+    """
+    if lod:
+        layers = resolve_lod(size, layers)
+    k = choose_factor(size, layers, budget)
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+
+    for antialias, run in _runs(layers):
+        factor = k if antialias else 1
+        timings = {}
+        start = time.perf_counter()
+        img.alpha_composite(_draw_canvas(size, run, factor, timings))
+        reduce_ms = (time.perf_counter() - start - sum(timings.values())) * 1000
+
+        if report is not None:
+            for layer in run:
+                report.append({
+                    "size": size,
+                    "layer": layer.name,
+                    "factor": factor,
+                    "draw_ms": timings[layer.name] * 1000,
+                    # The shared canvas reduce is split evenly across the run
+                    "reduce_ms": reduce_ms / len(run),
+                    "edge_change": _edge_change(size, layer, factor) if factor > 1 else 0.0,
+                })
+
+    return img
+
+def print_report(report):
+    """Print a per-layer time and quality table"""
+    print(f"\n{'size':>5}  {'layer':<16} {'AA':>3} {'draw ms':>8} {'reduce ms':>9} {'edge Δ%':>8}")
+    for row in report:
+        print(f"{row['size']:>5}  {row['layer']:<16} {row['factor']:>2}x "
+              f"{row['draw_ms']:>8.2f} {row['reduce_ms']:>9.2f} {row['edge_change']:>8.2f}")
+    total_ms = sum(row["draw_ms"] + row["reduce_ms"] for row in report)
+    print(f"⏱  Total layer time: {total_ms:.1f} ms")
+
+def measure_lod(size, layers, budget=DEFAULT_AA_BUDGET, repeats=3):
+    """Time one size with and without level of detail (best of repeats)
+
+    Returns a dict with the LOD tier, both times in milliseconds and what
+    happened to each simplified layer ("grid → grid rows", "no badge").
+    """
+    def best_ms(lod):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            render_layers(size, layers, budget, lod=lod)
+            times.append((time.perf_counter() - start) * 1000)
+        return min(times)
+
+    simplified = []
+    for layer in layers:
+        resolved = resolve_lod(size, [layer])
+        if not resolved:
+            simplified.append(f"no {layer.name}")
+        elif resolved[0] is not layer:
+            simplified.append(f"{layer.name} → {resolved[0].name}")
+    full_ms = best_ms(False)
+    return {
+        "size": size,
+        "tier": lod_tier(size, layers),
+        "full_ms": full_ms,
+        # Nothing simplified means the same render; don't report timing noise
+        "lod_ms": best_ms(True) if simplified else full_ms,
+        "simplified": simplified,
+    }
+
+def print_lod_report(rows):
+    """Print render time saved by level of detail, per tier"""
+    tiers = {}
+    for row in rows:
+        tiers.setdefault(row["tier"], []).append(row)
+
+    print(f"\n{'LOD tier':<12} {'sizes':<22} {'full ms':>8} {'LOD ms':>8} {'saved':>7}  simplified")
+    for tier, tier_rows in sorted(tiers.items(), key=lambda item: item[1][0]["size"]):
+        full_ms = sum(row["full_ms"] for row in tier_rows)
+        lod_ms = sum(row["lod_ms"] for row in tier_rows)
+        saved = 100 * (full_ms - lod_ms) / full_ms if full_ms else 0
+        sizes = ",".join(str(row["size"]) for row in sorted(tier_rows, key=lambda row: row["size"]))
+        simplified = ", ".join(tier_rows[0]["simplified"]) or "-"
+        print(f"{tier:<12} {sizes:<22} {full_ms:>8.1f} {lod_ms:>8.1f} {saved:>6.0f}%  {simplified}")
+    total_full = sum(row["full_ms"] for row in rows)
+    total_lod = sum(row["lod_ms"] for row in rows)
+    print(f"⏱  Saved {total_full - total_lod:.1f} ms of {total_full:.1f} ms")
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for rendered Kansyl assets
+Rendered PNGs are stored under a hash of everything that went into them,
+so any machine with the same inputs can pull them instead of re-rendering
+
+Backends are configured with KANSYL_ASSET_CACHE, a comma-separated list
+tried in order (the first is treated as the local cache):
+
+    KANSYL_ASSET_CACHE=~/.cache/kansyl-assets,/mnt/shared/kansyl,http://cache.local:8765
+    KANSYL_ASSET_CACHE=off
+
+Run a stand-in HTTP store for a team or for testing:
+
+    python3 Scripts/artifact_cache.py serve --root /tmp/kansyl-cache --port 8765
+"""
+
+import io
+import os
+import sys
+import json
+import uuid
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CACHE_DIR = BASE_DIR / ".asset_cache" / "artifacts"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Bump when the stored object format or key scheme changes
+CACHE_VERSION = 1
+
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+# Eviction trims a full cache to this fraction of max_bytes, so it runs once
+# per batch of writes instead of on every write
+EVICT_TO = 0.9
+
+def _wrap(data):
+    """Prefix a payload with its SHA-256 so corruption is detected on read"""
+    return hashlib.sha256(data).digest() + data
+
+def _unwrap(blob):
+    """Return the payload if its checksum matches, otherwise None"""
+    digest, data = blob[:_DIGEST_SIZE], blob[_DIGEST_SIZE:]
+    if len(digest) != _DIGEST_SIZE or hashlib.sha256(data).digest() != digest:
+        return None
+    return data
+
+class LocalStore:
+    """Cache backend on a local directory or a shared (NFS) path
+
+    Objects are written to a temporary file and renamed into place, so
+    concurrent writers on a shared mount never expose partial objects.
+    When max_bytes is set, the least recently used objects are evicted.
+    The cache is measured once and then tracked as a running total, so
+    writes only scan the directory when it actually has to be trimmed.
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = Path(root).expanduser()
+        self.max_bytes = max_bytes
+        self.total = None
+        self.lock = threading.Lock()
+
+    def __str__(self):
+        return str(self.root)
+
+    def _path(self, key):
+        return self.root / key[:2] / key
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                blob = f.read()
+        except OSError:
+            return None
+
+        data = _unwrap(blob)
+        if data is None:
+            # Corrupt object: drop it and treat as a miss
+            path.unlink(missing_ok=True)
+            return None
+
+        # Touch the object so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # pids repeat across hosts sharing a mount; a random name doesn't
+        tmp_path = path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        blob = _wrap(data)
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        if self.max_bytes is None:
+            return
+        with self.lock:
+            if self.total is None:
+                self.total = sum(size for _, size, _ in self._objects())
+            else:
+                # Overcounts a replaced object, which only brings eviction forward
+                self.total += len(blob)
+            full = self.total > self.max_bytes
+        if full:
+            self.evict(int(self.max_bytes * EVICT_TO))
+
+    def _objects(self):
+        """(mtime, size, path) of every stored object"""
+        objects = []
+        for path in self.root.glob("??/*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            objects.append((stat.st_mtime, stat.st_size, path))
+        return objects
+
+    def evict(self, target=None):
+        """Remove least recently used objects until under target (default max_bytes)"""
+        target = self.max_bytes if target is None else target
+        objects = sorted(self._objects())
+        total = sum(size for _, size, _ in objects)
+
+        removed = 0
+        for _, size, path in objects:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        with self.lock:
+            self.total = total
+        return removed
+
+class HTTPStore:
+    """Cache backend on a plain HTTP object store (GET/PUT /<key>)
+
+    Network errors are treated as misses so an unreachable store only
+    costs the time of the failed request, once.
+    """
+
+    def __init__(self, base_url, timeout=5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.available = True
+
+    def __str__(self):
+        return self.base_url
+
+    def _request(self, method, key, data=None):
+        if not self.available:
+            return None
+        request = urllib.request.Request(f"{self.base_url}/{key}", data=data, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                print(f"⚠️  Cache store {self.base_url} returned {e.code}")
+            return None
+        except (urllib.error.URLError, OSError) as e:
+            print(f"⚠️  Cache store {self.base_url} unavailable: {e}")
+            self.available = False
+            return None
+
+    def get(self, key):
+        blob = self._request("GET", key)
+        return _unwrap(blob) if blob is not None else None
+
+    def put(self, key, data):
+        self._request("PUT", key, _wrap(data))
+
+class ArtifactCache:
+    """Layered artifact cache
+
+    Lookups go through the backends in order; a hit in a later (remote)
+    backend is copied into the earlier ones. New artifacts are written to
+    every backend.
+    """
+
+    def __init__(self, backends):
+        self.backends = backends
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        for i, backend in enumerate(self.backends):
+            data = backend.get(key)
+            if data is not None:
+                for earlier in self.backends[:i]:
+                    earlier.put(key, data)
+                self.hits += 1
+                return data
+        self.misses += 1
+        return None
+
+    def put(self, key, data):
+        for backend in self.backends:
+            backend.put(key, data)
+
+    def summary(self):
+        return f"♻️  Asset cache: {self.hits} hits, {self.misses} misses"
+
+_fingerprints = {}
+
+def source_fingerprint(paths):
+    """Hash the contents of the source files that define a renderer"""
+    digest = hashlib.sha256()
+    for path in sorted(str(p) for p in paths):
+        if path not in _fingerprints:
+            with open(path, 'rb') as f:
+                _fingerprints[path] = hashlib.sha256(f.read()).hexdigest()
+        digest.update(_fingerprints[path].encode())
+    return digest.hexdigest()
+
+def cache_key(sources, **params):
+    """Key for a render: renderer source files, Pillow version and parameters
+
+    The platform is part of the key because the generators pick up system
+    fonts that differ between macOS and Linux CI runners. Parameters must
+    be JSON-serializable.
+    """
+    from PIL import __version__ as pillow_version
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "sources": source_fingerprint(sources),
+        "pillow": pillow_version,
+        "platform": sys.platform,
+        "params": params,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+_file_digests = {}
+
+def file_digest(path):
+    """SHA-256 of a file's contents, for keying renders on an input image
+
+    Digests are remembered per (path, mtime, size) for the life of the process.
+    """
+    stat = os.stat(path)
+    memo_key = (str(path), stat.st_mtime_ns, stat.st_size)
+    if memo_key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_digests[memo_key] = digest.hexdigest()
+    return _file_digests[memo_key]
+
+def encode_png(img, **save_options):
+    """Encode an image as PNG bytes"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG', **save_options)
+    return buffer.getvalue()
+
+def write_output(path, data):
+    """Write a rendered file by replacing it rather than rewriting it in place
+
+    Catalog files may be hardlinked between targets, and writing into a
+    linked file would silently change every copy.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def cached_pngs(cache, sources, names, render, **params):
+    """PNG bytes for each name, rendering only the ones missing from the cache
+
+    render(missing_names) must return {name: Image}. Each name is cached
+    under its own key built from the sources and params. With cache=None
+    everything is rendered.
+    """
+    keys = {}
+    pngs = {}
+    if cache is not None:
+        for name in names:
+            keys[name] = cache_key(sources, name=name, **params)
+            pngs[name] = cache.get(keys[name])
+
+    missing = [name for name in names if pngs.get(name) is None]
+    if missing:
+        images = render(missing)
+        for name in missing:
+            pngs[name] = encode_png(images[name])
+            if cache is not None:
+                cache.put(keys[name], pngs[name])
+    return pngs
+
+def backend_from_spec(spec, max_bytes=None):
+    """Build a backend from a path or http(s) URL"""
+    if spec.startswith(("http://", "https://")):
+        return HTTPStore(spec)
+    return LocalStore(spec, max_bytes)
+
+def default_cache():
+    """Cache configured from KANSYL_ASSET_CACHE, or None when disabled"""
+    setting = os.environ.get("KANSYL_ASSET_CACHE", str(DEFAULT_CACHE_DIR)).strip()
+    if setting.lower() in ("", "0", "off", "none"):
+        return None
+    max_bytes = int(os.environ.get("KANSYL_ASSET_CACHE_MAX_MB", DEFAULT_MAX_BYTES // (1024 * 1024))) * 1024 * 1024
+
+    backends = []
+    for i, spec in enumerate(s.strip() for s in setting.split(",")):
+        if spec:
+            # Only the first (local) backend is size-bounded; shared stores
+            # are managed by whoever runs them
+            backends.append(backend_from_spec(spec, max_bytes if i == 0 else None))
+    return ArtifactCache(backends)
+
+def make_handler(store):
+    """HTTP handler serving GET/PUT/HEAD of objects from a LocalStore"""
+
+    class CacheHandler(BaseHTTPRequestHandler):
+        def _key(self):
+            key = self.path.strip("/")
+            if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+                self.send_error(400, "Invalid key")
+                return None
+            return key
+
+        def do_GET(self):
+            key = self._key()
+            if key is None:
+                return
+            try:
+                with open(store._path(key), 'rb') as f:
+                    blob = f.read()
+                os.utime(store._path(key))
+            except OSError:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(blob)))
+            self.end_headers()
+            self.wfile.write(blob)
+
+        def do_HEAD(self):
+            key = self._key()
+            if key is None:
+                return
+            self.send_response(200 if store._path(key).exists() else 404)
+            self.end_headers()
+
+        def do_PUT(self):
+            key = self._key()
+            if key is None:
+                return
+            blob = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            data = _unwrap(blob)
+            if data is None:
+                self.send_error(422, "Checksum mismatch")
+                return
+            store.put(key, data)
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return CacheHandler
+
+def main():
+    """Serve a cache directory over HTTP, or inspect and prune the local cache"""
+    parser = argparse.ArgumentParser(description="Kansyl rendered-asset cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Serve a cache directory over HTTP")
+    serve.add_argument("--root", default=str(DEFAULT_CACHE_DIR), help="Directory holding the objects")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--max-mb", type=int, default=None, help="Evict LRU objects beyond this size")
+
+    prune = subparsers.add_parser("prune", help="Evict LRU objects from a cache directory")
+    prune.add_argument("--root", default=str(DEFAULT_CACHE_DIR))
+    prune.add_argument("--max-mb", type=int, required=True)
+
+    args = parser.parse_args()
+    max_bytes = args.max_mb * 1024 * 1024 if args.max_mb is not None else None
+    store = LocalStore(args.root, max_bytes)
+
+    if args.command == "prune":
+        removed = store.evict()
+        print(f"🧹 Evicted {removed} objects from {store}")
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(store))
+    print(f"📦 Serving asset cache {store} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
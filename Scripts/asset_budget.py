@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Bundle-size budgets for the Kansyl asset catalog
+Totals the bytes of every set in Assets.xcassets, checks them against the
+budgets in Scripts/asset_budgets.json and, with --history, tracks the same
+totals across a range of commits
+
+History is read straight from the git object store (ls-tree and
+cat-file --batch-check), so no commit is ever checked out. Blob sizes are
+cached by object ID in .asset_cache/blob_sizes.json; object IDs never
+change meaning, so the cache never needs invalidating, and commits that
+share a catalog tree are only listed once.
+
+Usage:
+    python3 Scripts/asset_budget.py                      # working tree, exit 1 if over budget
+    python3 Scripts/asset_budget.py --history main~100..main   # exit 1 if the last commit is over
+"""
+
+import os
+import sys
+import json
+import fnmatch
+import argparse
+import subprocess
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CATALOG = "kansyl/Assets.xcassets"
+DEFAULT_BUDGETS = Path(__file__).with_name("asset_budgets.json")
+DEFAULT_CACHE = BASE_DIR / ".asset_cache" / "blob_sizes.json"
+
+# Directory suffixes of asset catalog sets
+SET_EXTENSIONS = (".appiconset", ".imageset", ".colorset", ".dataset", ".symbolset")
+
+# Name used for files that sit directly in the catalog root
+ROOT_GROUP = "(catalog)"
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+def parse_size(value):
+    """Bytes from an int or a string like "32KB" or "1.5MB\""""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = value.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _UNITS[unit])
+    return int(text)
+
+def format_size(size):
+    """Short human-readable size"""
+    if abs(size) >= 1024 ** 2:
+        return f"{size / 1024 ** 2:.2f} MB"
+    if abs(size) >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size} B"
+
+def set_name(relative_path):
+    """The set (or top-level folder) a catalog file is counted under"""
+    parts = Path(relative_path).parts
+    for i, part in enumerate(parts[:-1]):
+        if part.endswith(SET_EXTENSIONS):
+            return "/".join(parts[:i + 1])
+    return parts[0] if len(parts) > 1 else ROOT_GROUP
+
+def totals_from_files(files):
+    """Per-set byte totals from (relative path, size) pairs"""
+    totals = {}
+    for path, size in files:
+        name = set_name(path)
+        totals[name] = totals.get(name, 0) + size
+    return totals
+
+def scan_working_tree(catalog_dir):
+    """Per-set byte totals of a catalog on disk"""
+    files = []
+    for root, _, filenames in os.walk(catalog_dir):
+        for filename in filenames:
+            path = Path(root) / filename
+            files.append((path.relative_to(catalog_dir).as_posix(), path.stat().st_size))
+    return totals_from_files(files)
+
+def load_budgets(path):
+    """Catalog and per-set budgets in bytes; set budgets keep their file order"""
+    with open(path) as f:
+        config = json.load(f)
+    catalog = parse_size(config["catalog"]) if config.get("catalog") is not None else None
+    sets = [(pattern, parse_size(limit)) for pattern, limit in config.get("sets", {}).items()]
+    return catalog, sets
+
+def budget_for(name, set_budgets):
+    """The first set budget whose glob matches a set name, or None"""
+    for pattern, limit in set_budgets:
+        if fnmatch.fnmatch(name, pattern):
+            return limit
+    return None
+
+def check_budgets(totals, budgets):
+    """List of (name, size, limit) for everything over budget"""
+    catalog_budget, set_budgets = budgets
+    over = []
+    total = sum(totals.values())
+    if catalog_budget is not None and total > catalog_budget:
+        over.append((ROOT_GROUP + " total", total, catalog_budget))
+    for name, size in sorted(totals.items()):
+        limit = budget_for(name, set_budgets)
+        if limit is not None and size > limit:
+            over.append((name, size, limit))
+    return over
+
+class GitObjects:
+    """Reads catalog trees and blob sizes from a repository's object store"""
+
+    def __init__(self, repo, cache_path):
+        self.repo = str(repo)
+        self.cache_path = cache_path
+        self.sizes = {}
+        self.cache_hits = 0
+        self.looked_up = 0
+        self.trees = {}
+        try:
+            with open(cache_path) as f:
+                self.sizes = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def _git(self, *args, input=None):
+        result = subprocess.run(["git", "-C", self.repo, *args], input=input,
+                                capture_output=True, text=True, check=True)
+        return result.stdout
+
+    def commits(self, revision_range):
+        """Commit IDs in a range, oldest first"""
+        return self._git("rev-list", "--reverse", revision_range).split()
+
+    def _batch_check(self, names):
+        """cat-file --batch-check output for many object names in one process"""
+        if not names:
+            return []
+        output = self._git("cat-file", "--batch-check=%(objectname) %(objecttype) %(objectsize)",
+                           input="".join(f"{name}\n" for name in names))
+        return output.splitlines()
+
+    def catalog_trees(self, commits, catalog):
+        """Tree ID of the catalog in each commit (None where it doesn't exist)"""
+        trees = {}
+        for commit, line in zip(commits, self._batch_check([f"{c}:{catalog}" for c in commits])):
+            fields = line.split()
+            trees[commit] = fields[0] if len(fields) == 3 and fields[1] == "tree" else None
+        return trees
+
+    def blob_sizes(self, oids):
+        """Sizes of blobs, from the cache or one batched lookup"""
+        missing = sorted({oid for oid in oids if oid not in self.sizes})
+        self.cache_hits += len(set(oids)) - len(missing)
+        for line in self._batch_check(missing):
+            oid, _, size = line.split()
+            self.sizes[oid] = int(size)
+        self.looked_up += len(missing)
+        return {oid: self.sizes[oid] for oid in oids}
+
+    def tree_totals(self, tree):
+        """Per-set byte totals of a catalog tree, once per tree ID"""
+        if tree not in self.trees:
+            entries = []
+            for line in self._git("ls-tree", "-r", "-z", tree).split("\0"):
+                if not line:
+                    continue
+                meta, path = line.split("\t", 1)
+                _, object_type, oid = meta.split()
+                if object_type == "blob":
+                    entries.append((path, oid))
+            sizes = self.blob_sizes([oid for _, oid in entries])
+            self.trees[tree] = totals_from_files((path, sizes[oid]) for path, oid in entries)
+        return self.trees[tree]
+
+    def save(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.sizes, f)
+        os.replace(tmp_path, self.cache_path)
+
+def history(repo, revision_range, catalog, cache_path):
+    """([(commit, totals)] oldest first, the GitObjects used) for a range"""
+    objects = GitObjects(repo, cache_path)
+    commits = objects.commits(revision_range)
+    trees = objects.catalog_trees(commits, catalog)
+    rows = [(commit, objects.tree_totals(trees[commit]) if trees[commit] else {}) for commit in commits]
+    objects.save()
+    return rows, objects
+
+def print_totals(totals, budgets, top):
+    """Largest sets with their budgets"""
+    _, set_budgets = budgets
+    print(f"\n{'set':<40} {'size':>10} {'budget':>10}")
+    for name, size in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+        limit = budget_for(name, set_budgets)
+        flag = " ❌" if limit is not None and size > limit else ""
+        print(f"{name:<40} {format_size(size):>10} {format_size(limit) if limit else '-':>10}{flag}")
+
+def main():
+    """Report catalog size per set and enforce budgets"""
+    parser = argparse.ArgumentParser(description="Asset catalog size budgets")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG,
+                        help="Catalog path relative to the repository root")
+    parser.add_argument("--budgets", default=str(DEFAULT_BUDGETS), help="Budget file (JSON)")
+    parser.add_argument("--history", metavar="RANGE", default=None,
+                        help="Track totals across a revision range, e.g. main~50..main")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE), help="Blob size cache (keyed by object ID)")
+    parser.add_argument("--top", type=int, default=15, help="Number of sets to list (default: 15)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    budgets = load_budgets(args.budgets)
+
+    if args.history:
+        try:
+            rows, objects = history(BASE_DIR, args.history, args.catalog, Path(args.cache))
+        except subprocess.CalledProcessError as e:
+            print(f"❌ git failed: {e.stderr.strip()}")
+            sys.exit(1)
+
+        report = [{
+            "commit": commit,
+            "total_bytes": sum(totals.values()),
+            "sets": totals,
+            "over_budget": [name for name, _, _ in check_budgets(totals, budgets)],
+        } for commit, totals in rows]
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(f"📈 {args.catalog} across {len(rows)} commits "
+                  f"({objects.looked_up} blob sizes looked up, {objects.cache_hits} cached)")
+            previous = None
+            for row in report:
+                delta = "" if previous is None else f"{row['total_bytes'] - previous:+,}"
+                over = f"  ❌ {', '.join(row['over_budget'])}" if row["over_budget"] else ""
+                print(f"   {row['commit'][:10]} {format_size(row['total_bytes']):>10} {delta:>12}{over}")
+                previous = row["total_bytes"]
+
+            if len(rows) > 1:
+                first, last = rows[0][1], rows[-1][1]
+                growth = {name: last.get(name, 0) - first.get(name, 0) for name in set(first) | set(last)}
+                changed = sorted((item for item in growth.items() if item[1]), key=lambda item: -abs(item[1]))
+                print("\n📊 Biggest changes over the range:" if changed else "\n📊 No set changed size over the range")
+                for name, change in changed[:args.top]:
+                    print(f"   {name:<40} {change:+,} bytes")
+        # The range passes or fails on where it ends up
+        if report and report[-1]["over_budget"]:
+            sys.exit(1)
+        return
+
+    catalog_dir = BASE_DIR / args.catalog
+    if not catalog_dir.is_dir():
+        print(f"❌ Asset catalog not found: {catalog_dir}")
+        sys.exit(1)
+    totals = scan_working_tree(catalog_dir)
+    over = check_budgets(totals, budgets)
+
+    if args.json:
+        print(json.dumps({
+            "total_bytes": sum(totals.values()),
+            "sets": totals,
+            "over_budget": [{"name": name, "bytes": size, "budget": limit} for name, size, limit in over],
+        }, indent=2))
+    else:
+        catalog_budget, _ = budgets
+        print(f"📦 {catalog_dir}: {format_size(sum(totals.values()))} in {len(totals)} sets"
+              + (f" (budget {format_size(catalog_budget)})" if catalog_budget else ""))
+        print_totals(totals, budgets, args.top)
+        if over:
+            print("\n❌ Over budget:")
+            for name, size, limit in over:
+                print(f"   {name}: {format_size(size)} > {format_size(limit)}")
+        else:
+            print("\n✅ Within budget")
+    if over:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
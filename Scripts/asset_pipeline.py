@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Streaming asset pipeline for Kansyl
+Fetches source artwork, decodes, resizes, encodes and writes it into the
+asset catalog with every stage running concurrently
+
+Each stage has a bounded queue and its own worker threads, so a slow
+download doesn't hold up resizing and a slow encoder pushes back on the
+stages before it. New images are written to a staging copy of each set;
+the sets (with their Contents.json) are swapped into the catalog only
+after every stage has finished without errors.
+
+Sources are untrusted, so they are decoded in sandboxed worker processes
+(see safe_decode.py). A source that is rejected there is quarantined and
+its set is skipped; the other sets are still written.
+
+Usage:
+    python3 Scripts/asset_pipeline.py --app-icon https://example.com/icon.png
+    python3 Scripts/asset_pipeline.py --logo netflix=art/netflix.png --logo hbo=art/hbo.png
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import argparse
+import threading
+import urllib.request
+from pathlib import Path
+
+# Check if Pillow is installed
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image
+
+from color_management import COLOR_SPACES, to_working_space, transform_stats
+from resampling import BACKENDS, resize as resample, set_backend
+from resize_app_icon import ICON_CONFIGS, icon_contents_entry, icon_filename, prepare_icon
+from safe_decode import DecodeRejected, SandboxedDecoder, add_limit_arguments, limits_from_args
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CATALOG = BASE_DIR / "kansyl" / "Assets.xcassets"
+
+# Brand logos are 40pt images at 1x, 2x and 3x
+LOGO_POINT_SIZE = 40
+
+# Marks the end of a stage's input
+_DONE = object()
+
+class Stage:
+    """One pipeline stage: a bounded input queue and a pool of worker threads
+
+    fn(item) returns an iterable of items for the next stage (possibly
+    empty). Exceptions are recorded against the item and don't stop the
+    stage.
+    """
+
+    def __init__(self, name, fn, workers=1, queue_size=8):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.next = None
+        self.errors = []
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+        self.first_start = None
+        self.last_end = None
+        self._lock = threading.Lock()
+        self._running = workers
+
+    def _worker(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+
+            depth = self.inbox.qsize()
+            start = time.perf_counter()
+            try:
+                outputs = list(self.fn(item))
+            except Exception as e:
+                outputs = []
+                with self._lock:
+                    self.errors.append((item.get("label", "?"), str(e)))
+            end = time.perf_counter()
+
+            with self._lock:
+                self.processed += 1
+                self.busy_seconds += end - start
+                self.depth_samples += 1
+                self.depth_total += depth
+                self.max_depth = max(self.max_depth, depth)
+                if self.first_start is None:
+                    self.first_start = start
+                self.last_end = end
+
+            # Blocks while the next stage is full, which throttles this one
+            if self.next is not None:
+                for output in outputs:
+                    self.next.inbox.put(output)
+
+        # The last worker out tells every worker of the next stage to stop
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last and self.next is not None:
+            for _ in range(self.next.workers):
+                self.next.inbox.put(_DONE)
+
+    def start(self):
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+class Pipeline:
+    """A chain of stages fed from an iterable of items"""
+
+    def __init__(self, stages):
+        self.stages = stages
+        for stage, following in zip(stages, stages[1:]):
+            stage.next = following
+
+    def run(self, items):
+        start = time.perf_counter()
+        for stage in self.stages:
+            stage.start()
+
+        first = self.stages[0]
+        for item in items:
+            first.inbox.put(item)
+        for _ in range(first.workers):
+            first.inbox.put(_DONE)
+
+        for stage in self.stages:
+            stage.join()
+        self.elapsed = time.perf_counter() - start
+
+    @property
+    def errors(self):
+        return [(stage.name, label, error) for stage in self.stages for label, error in stage.errors]
+
+    def print_report(self):
+        print(f"\n{'stage':<8} {'workers':>7} {'items':>6} {'items/s':>8} {'busy %':>7} {'avg q':>6} {'max q':>6}")
+        for stage in self.stages:
+            active = (stage.last_end - stage.first_start) if stage.processed else 0
+            throughput = stage.processed / active if active > 0 else 0
+            busy = 100 * stage.busy_seconds / (self.elapsed * stage.workers) if self.elapsed else 0
+            avg_depth = stage.depth_total / stage.depth_samples if stage.depth_samples else 0
+            print(f"{stage.name:<8} {stage.workers:>7} {stage.processed:>6} {throughput:>8.1f} "
+                  f"{busy:>6.0f}% {avg_depth:>6.1f} {stage.max_depth:>6}")
+        print(f"⏱  Total: {self.elapsed:.2f}s")
+
+# Stage functions. Items are dicts that carry a "label" for error reports.
+
+def make_fetcher(max_bytes):
+    """Stage function reading source bytes from a URL or a local path
+
+    Reads at most max_bytes + 1 so an oversized download is cut short and
+    left for the decoder to reject.
+    """
+
+    def fetch(item):
+        source = item["source"]
+        if source.startswith(("http://", "https://")):
+            with urllib.request.urlopen(source, timeout=30) as response:
+                item["data"] = response.read(max_bytes + 1)
+        else:
+            with open(source, 'rb') as f:
+                item["data"] = f.read(max_bytes + 1)
+        yield item
+
+    return fetch
+
+def make_decoder(decoder, skipped):
+    """Stage function decoding source bytes in the sandbox
+
+    Converts to the working color space afterwards, in this process. A
+    rejected source adds its set to skipped and produces no output.
+    """
+
+    def decode(item):
+        try:
+            img = decoder.decode(item.pop("data"), item["label"])
+        except DecodeRejected as e:
+            skipped[item["set"]] = e.reason
+            return
+        item["image"] = to_working_space(img, item["color_space"])
+        yield item
+
+    return decode
+
+def resize(item):
+    """Fan out one resized image per distinct pixel size"""
+    img = item.pop("image")
+    by_size = {}
+    for filename, pixel_size in item["outputs"]:
+        by_size.setdefault(pixel_size, []).append(filename)
+
+    for pixel_size, filenames in by_size.items():
+        if item["kind"] == "appicon":
+            resized = prepare_icon(img, pixel_size)
+        else:
+            # Logos keep their aspect ratio and are letterboxed into a square
+            scale = min(1.0, pixel_size / max(img.width, img.height))
+            resized = resample(img.convert('RGBA'), (max(1, round(img.width * scale)),
+                                                     max(1, round(img.height * scale))))
+            canvas = Image.new('RGBA', (pixel_size, pixel_size), (0, 0, 0, 0))
+            canvas.paste(resized, ((pixel_size - resized.width) // 2,
+                                   (pixel_size - resized.height) // 2))
+            if "icc_profile" in img.info:
+                canvas.info["icc_profile"] = img.info["icc_profile"]
+            resized = canvas
+        yield {
+            "label": f"{item['label']} {pixel_size}px",
+            "set": item["set"],
+            "filenames": filenames,
+            "image": resized,
+        }
+
+def encode(item):
+    """Encode a resized image as PNG"""
+    buffer = io.BytesIO()
+    item.pop("image").save(buffer, 'PNG', optimize=True)
+    item["png"] = buffer.getvalue()
+    yield item
+
+def make_writer(staging):
+    """Stage function writing PNGs into each set's staging directory"""
+
+    def write(item):
+        set_dir = staging[item["set"]]
+        for filename in item["filenames"]:
+            with open(set_dir / filename, 'wb') as f:
+                f.write(item["png"])
+        return ()
+
+    return write
+
+# Jobs: one source image and the set it becomes
+
+def app_icon_job(source, set_name="AppIcon.appiconset", color_space="srgb"):
+    """Job that turns one source image into a full app icon set"""
+    return {
+        "label": set_name,
+        "kind": "appicon",
+        "source": source,
+        "color_space": color_space,
+        "set": set_name,
+        "outputs": [(icon_filename(c), int(c["size"] * c["scale"])) for c in ICON_CONFIGS],
+        "contents": {
+            "images": [icon_contents_entry(c) for c in ICON_CONFIGS],
+            "info": {"author": "xcode", "version": 1},
+        },
+    }
+
+def logo_job(name, source, point_size=LOGO_POINT_SIZE, color_space="srgb"):
+    """Job that turns one source image into a brand logo imageset"""
+    filenames = [f"{name}.png", f"{name}@2x.png", f"{name}@3x.png"]
+    return {
+        "label": f"{name}-logo.imageset",
+        "kind": "logo",
+        "source": source,
+        "color_space": color_space,
+        "set": f"{name}-logo.imageset",
+        "outputs": [(filename, point_size * scale) for scale, filename in enumerate(filenames, 1)],
+        "contents": {
+            "images": [
+                {"filename": filename, "idiom": "universal", "scale": f"{scale}x"}
+                for scale, filename in enumerate(filenames, 1)
+            ],
+            "info": {"author": "xcode", "version": 1},
+        },
+    }
+
+def clean_leftovers(catalog_dir):
+    """Clear .staging and .old directories left behind by an interrupted run
+
+    An .old directory whose set is missing is the only copy of that set
+    (the run stopped between moving it aside and moving the new one in),
+    so it is put back rather than deleted.
+    """
+    for leftover in catalog_dir.glob(".*.staging"):
+        shutil.rmtree(leftover, ignore_errors=True)
+    for leftover in catalog_dir.glob(".*.old"):
+        target = catalog_dir / leftover.name[1:-len(".old")]
+        if target.exists():
+            shutil.rmtree(leftover)
+        else:
+            os.replace(leftover, target)
+
+def commit_sets(catalog_dir, staging, jobs):
+    """Swap every staged set into the catalog, all or nothing
+
+    Existing sets are moved aside to .<set>.old before the staged ones are
+    moved in. If any rename fails, the sets already swapped are put back
+    and the error is raised, so the catalog is either fully updated or
+    left as it was.
+    """
+    for job in jobs:
+        set_dir = staging[job["set"]]
+        with open(set_dir / "Contents.json", 'w') as f:
+            json.dump(job["contents"], f, indent=2)
+
+    swapped = []
+    try:
+        for job in jobs:
+            target = catalog_dir / job["set"]
+            old = catalog_dir / f".{job['set']}.old"
+            if target.exists():
+                os.replace(target, old)
+                swapped.append((target, old, staging[job["set"]]))
+            else:
+                swapped.append((target, None, staging[job["set"]]))
+            os.replace(staging[job["set"]], target)
+    except OSError:
+        for target, old, staged in reversed(swapped):
+            if not staged.exists() and target.exists():
+                os.replace(target, staged)
+            if old is not None and old.exists():
+                os.replace(old, target)
+        raise
+
+    for _, old, _ in swapped:
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+
+def run(jobs, catalog_dir, workers, queue_size=8, limits=None):
+    """Run the jobs through the pipeline
+
+    Returns the pipeline for reporting, the sandboxed decoder and the sets
+    skipped because their source was quarantined ({set: reason}).
+    """
+    clean_leftovers(catalog_dir)
+    staging = {}
+    for job in jobs:
+        set_dir = catalog_dir / f".{job['set']}.staging"
+        if set_dir.exists():
+            shutil.rmtree(set_dir)
+        set_dir.mkdir(parents=True)
+        staging[job["set"]] = set_dir
+
+    skipped = {}
+    with SandboxedDecoder(workers["decode"], limits) as decoder:
+        pipeline = Pipeline([
+            Stage("fetch", make_fetcher(decoder.limits.max_bytes), workers["fetch"], queue_size),
+            Stage("decode", make_decoder(decoder, skipped), workers["decode"], queue_size),
+            Stage("resize", resize, workers["resize"], queue_size),
+            Stage("encode", encode, workers["encode"], queue_size),
+            Stage("write", make_writer(staging), workers["write"], queue_size),
+        ])
+        pipeline.run(jobs)
+
+    for name in skipped:
+        shutil.rmtree(staging.pop(name), ignore_errors=True)
+    if pipeline.errors:
+        for set_dir in staging.values():
+            shutil.rmtree(set_dir, ignore_errors=True)
+    else:
+        commit_sets(catalog_dir, staging, [job for job in jobs if job["set"] not in skipped])
+    return pipeline, decoder, skipped
+
+def parse_workers(spec):
+    """Parse 'fetch=4,resize=2' into a full per-stage worker count map"""
+    cpus = os.cpu_count() or 2
+    workers = {"fetch": 4, "decode": 2, "resize": cpus, "encode": cpus, "write": 1}
+    for part in filter(None, spec.split(",")):
+        name, _, count = part.partition("=")
+        if name not in workers:
+            raise argparse.ArgumentTypeError(f"Unknown stage: {name}")
+        workers[name] = int(count)
+    return workers
+
+def main():
+    """Build the requested sets without any prompts"""
+    parser = argparse.ArgumentParser(description="Fetch, resize and write catalog assets concurrently")
+    parser.add_argument("--app-icon", metavar="SOURCE", action="append", default=[],
+                        help="URL or path of app icon artwork (AppIcon.appiconset)")
+    parser.add_argument("--app-icon-set", default="AppIcon.appiconset",
+                        help="Set name for --app-icon (default: AppIcon.appiconset)")
+    parser.add_argument("--logo", metavar="NAME=SOURCE", action="append", default=[],
+                        help="Brand logo artwork for NAME-logo.imageset")
+    parser.add_argument("--catalog", default=str(DEFAULT_CATALOG), help="Asset catalog to write into")
+    parser.add_argument("--color-space", choices=COLOR_SPACES, default="srgb",
+                        help="Working color space sources are converted to (default: srgb)")
+    parser.add_argument("--workers", type=parse_workers, default=parse_workers(""),
+                        help="Per-stage worker counts, e.g. fetch=8,encode=4")
+    parser.add_argument("--queue-size", type=int, default=8, help="Capacity of each stage queue")
+    parser.add_argument("--resampler", choices=list(BACKENDS) + ["auto"], default=None,
+                        help="Resampling backend (default: KANSYL_RESAMPLER or pillow)")
+    add_limit_arguments(parser)
+    args = parser.parse_args()
+    if args.resampler:
+        set_backend(args.resampler)
+
+    jobs = [app_icon_job(source, args.app_icon_set, args.color_space) for source in args.app_icon]
+    for spec in args.logo:
+        name, _, source = spec.partition("=")
+        if not source:
+            parser.error(f"--logo expects NAME=SOURCE, got {spec!r}")
+        jobs.append(logo_job(name, source, color_space=args.color_space))
+    if not jobs:
+        parser.error("nothing to do: pass --app-icon and/or --logo")
+
+    sets = [job["set"] for job in jobs]
+    if len(set(sets)) != len(sets):
+        parser.error("each set can only be built from one source per run")
+
+    catalog_dir = Path(args.catalog)
+    print(f"🚚 Running {len(jobs)} jobs into {catalog_dir}")
+    try:
+        pipeline, decoder, skipped = run(jobs, catalog_dir, args.workers, args.queue_size, limits_from_args(args))
+    except OSError as e:
+        print(f"❌ Could not update {catalog_dir}; it was left unchanged: {e}")
+        sys.exit(1)
+    pipeline.print_report()
+    stats = transform_stats()
+    print(f"🎨 Color transforms: {stats['transform_builds']} built, {stats['transform_hits']} reused")
+    print(decoder.summary())
+
+    if skipped:
+        print(f"\n⚠️  Skipped {len(skipped)} sets with quarantined sources:")
+        for name, reason in skipped.items():
+            print(f"   {name}: {reason}")
+        for label, reason, path in decoder.quarantined:
+            print(f"   🔒 {label} → {path}")
+
+    if pipeline.errors:
+        print(f"\n❌ {len(pipeline.errors)} errors; the catalog was left unchanged:")
+        for stage, label, error in pipeline.errors:
+            print(f"   [{stage}] {label}: {error}")
+        sys.exit(1)
+
+    written = [name for name in sets if name not in skipped]
+    print(f"\n✅ Wrote {len(written)} sets:")
+    for name in written:
+        print(f"   • {name}")
+    if skipped:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Preview sheet for the whole Kansyl asset catalog
+Draws every entry of Assets.xcassets on one labeled PNG, with the scale and
+size from Contents.json under each tile, so the catalog can be reviewed
+without opening each set in Xcode
+
+Thumbnails are cached by file hash in one pack file,
+.asset_cache/thumbnails.pack, which is memory-mapped on load. Only PNGs
+whose contents changed are decoded again; file hashes themselves are reused
+while a file's mtime and size are unchanged, so a rerun on an unchanged
+catalog decodes nothing. The pack also remembers what the last sheet was
+drawn from, and an up-to-date sheet is not drawn again.
+
+Usage:
+    python3 Scripts/catalog_preview.py
+    python3 Scripts/catalog_preview.py -o /tmp/catalog.png --thumb-size 128
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Check if Pillow is installed
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image, ImageDraw, ImageFont
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CATALOG = BASE_DIR / "kansyl" / "Assets.xcassets"
+DEFAULT_PACK = BASE_DIR / ".asset_cache" / "thumbnails.pack"
+DEFAULT_OUTPUT = BASE_DIR / ".asset_cache" / "catalog_preview.png"
+
+# Pack layout: header, raw RGBA thumbnails back to back, JSON index
+PACK_MAGIC = b"KTHUMBS\0"
+PACK_HEADER = struct.Struct("<8sIIQQ")  # magic, version, thumb size, index offset, index length
+
+# Bump when the pack layout or thumbnail rendering changes
+PACK_VERSION = 1
+
+BACKGROUND = (246, 246, 248, 255)
+HEADING = (28, 28, 30, 255)
+LABEL = (99, 99, 102, 255)
+PADDING = 10
+LABEL_LINES = 2
+
+class ThumbnailPack:
+    """Thumbnails keyed by file SHA-256, in one memory-mapped file
+
+    The pack is only ever replaced as a whole (written to a temporary file
+    and renamed), so readers never see a partial pack and unused
+    thumbnails are dropped on the next save.
+    """
+
+    def __init__(self, path, thumb_size):
+        self.path = Path(path)
+        self.thumb_size = thumb_size
+        self.map = None
+        self.thumbs = {}  # sha256 -> (offset, width, height, source width, source height)
+        self.files = {}   # relative path -> (mtime_ns, size, sha256)
+        self.sheet = {}   # key, path and mtime_ns of the last sheet written
+        self.added = {}
+        self.rehashed = False
+        try:
+            with open(self.path, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, thumb_size, index_offset, index_length = PACK_HEADER.unpack_from(self.map)
+            if magic != PACK_MAGIC or version != PACK_VERSION or thumb_size != self.thumb_size:
+                raise ValueError("stale pack")
+            index = json.loads(self.map[index_offset:index_offset + index_length])
+            self.thumbs = {sha: tuple(entry) for sha, entry in index["thumbs"].items()}
+            self.files = {key: tuple(entry) for key, entry in index["files"].items()}
+            self.sheet = index.get("sheet", {})
+        except (OSError, ValueError, KeyError, struct.error):
+            self.close()
+            self.thumbs, self.files, self.sheet = {}, {}, {}
+
+    def digest(self, key, path):
+        """SHA-256 of a file, reusing the recorded one while mtime and size match"""
+        stat = path.stat()
+        recorded = self.files.get(key)
+        if recorded and recorded[0] == stat.st_mtime_ns and recorded[1] == stat.st_size:
+            return recorded[2]
+        sha = hashlib.sha256(path.read_bytes()).hexdigest()
+        self.files[key] = (stat.st_mtime_ns, stat.st_size, sha)
+        self.rehashed = True
+        return sha
+
+    def __contains__(self, sha):
+        return sha in self.thumbs or sha in self.added
+
+    def get(self, sha):
+        """(thumbnail, size of the image it was made from)"""
+        if sha in self.added:
+            return self.added[sha]
+        offset, width, height, source_width, source_height = self.thumbs[sha]
+        thumb = Image.frombytes('RGBA', (width, height), self.map[offset:offset + width * height * 4])
+        return thumb, (source_width, source_height)
+
+    def add(self, sha, thumb, source_size):
+        self.added[sha] = (thumb, tuple(source_size))
+
+    def save(self, keep_files, keep_thumbs, sheet):
+        """Rewrite the pack with only the given files and thumbnails
+
+        Returns False without writing when nothing would change.
+        """
+        files = {key: self.files[key] for key in keep_files if key in self.files}
+        thumbs = [sha for sha in sorted(keep_thumbs) if sha in self]
+        if (not self.added and not self.rehashed and files == self.files and set(thumbs) == set(self.thumbs)
+                and sheet == self.sheet):
+            return False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        index = {"thumbs": {}, "files": files, "sheet": sheet}
+        with open(tmp_path, 'wb') as f:
+            f.write(bytes(PACK_HEADER.size))
+            for sha in thumbs:
+                if sha in self.added:
+                    thumb, source_size = self.added[sha]
+                    data, width, height = thumb.tobytes(), thumb.width, thumb.height
+                else:
+                    offset, width, height, *source_size = self.thumbs[sha]
+                    data = self.map[offset:offset + width * height * 4]
+                index["thumbs"][sha] = [f.tell(), width, height, *source_size]
+                f.write(data)
+            index_offset = f.tell()
+            blob = json.dumps(index).encode()
+            f.write(blob)
+            f.seek(0)
+            f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, self.thumb_size, index_offset, len(blob)))
+        os.replace(tmp_path, self.path)
+        return True
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+def make_thumbnail(path, thumb_size):
+    """Decode a PNG and shrink it to fit thumb_size (never enlarged)
+
+    Returns (thumbnail, original size).
+    """
+    # Imported here: only the thumbnail workers resample, and the NumPy
+    # backends make the import slow enough to notice on a cached rerun
+    from resampling import resize
+
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+    source_size = img.size
+    scale = min(1.0, thumb_size / max(img.width, img.height))
+    if scale < 1.0:
+        img = resize(img, (max(1, round(img.width * scale)), max(1, round(img.height * scale))))
+    return img, source_size
+
+def _thumbnail_worker(job):
+    """Process pool entry point; errors are returned instead of raised"""
+    sha, path, thumb_size = job
+    try:
+        thumb, source_size = make_thumbnail(path, thumb_size)
+        return sha, (thumb.size, thumb.tobytes(), source_size), None
+    except Exception as e:
+        return sha, None, str(e)
+
+def _color_from_contents(color):
+    """RGBA tuple from a colorset entry's "color" dictionary, or None"""
+    components = (color or {}).get("components")
+    if not components:
+        return None
+    values = []
+    for channel in ("red", "green", "blue", "alpha"):
+        value = str(components.get(channel, "1.000"))
+        if value.lower().startswith("0x"):
+            values.append(int(value, 16))
+        elif "." in value:
+            values.append(round(float(value) * 255))
+        else:
+            values.append(int(value))
+    return tuple(max(0, min(255, v)) for v in values)
+
+def _appearance_label(entry):
+    """"dark", "tinted" and the like from a Contents.json image entry"""
+    return " ".join(a.get("value", "") for a in entry.get("appearances", []))
+
+def read_entries(catalog_dir):
+    """Every catalog entry with the tiles to draw for it
+
+    Returns [(name, [tile])], where a tile is a dict with "file" (a path
+    relative to the catalog, or None), "color", "label" and "note".
+    """
+    entries = []
+    for entry_dir in sorted(p for p in catalog_dir.iterdir() if p.is_dir()):
+        contents_path = entry_dir / "Contents.json"
+        tiles = []
+        if not contents_path.exists():
+            # A plain folder: show whatever PNGs it holds
+            for path in sorted(entry_dir.glob("*.png")):
+                tiles.append({"file": path.relative_to(catalog_dir).as_posix(), "color": None,
+                              "label": "no Contents.json", "note": path.name})
+            entries.append((entry_dir.name, tiles))
+            continue
+
+        with open(contents_path) as f:
+            contents = json.load(f)
+        for image in contents.get("images", []):
+            label = " · ".join(part for part in (
+                image.get("scale", "any"),
+                f"{image['size']}pt" if image.get("size") else None,
+                _appearance_label(image) or None,
+            ) if part)
+            filename = image.get("filename")
+            tiles.append({
+                "file": (entry_dir / filename).relative_to(catalog_dir).as_posix() if filename else None,
+                "color": None,
+                "label": label,
+                "note": ("" if image.get("idiom") == "universal" else image.get("idiom", ""))
+                        if filename else "empty slot",
+            })
+        for color in contents.get("colors", []):
+            rgba = _color_from_contents(color.get("color"))
+            tiles.append({
+                "file": None,
+                "color": rgba,
+                "label": _appearance_label(color) or "any appearance",
+                "note": "#%02x%02x%02x" % rgba[:3] if rgba else "system default",
+            })
+        entries.append((entry_dir.name, tiles))
+    return entries
+
+def update_thumbnails(catalog_dir, entries, pack, workers=None):
+    """Make sure the pack has a thumbnail for every file the entries show
+
+    Returns ({relative path: sha256}, regenerated count, {path: error}).
+    """
+    digests = {}
+    errors = {}
+    for _, tiles in entries:
+        for tile in tiles:
+            key = tile["file"]
+            if key is None or key in digests or key in errors:
+                continue
+            path = catalog_dir / key
+            if path.is_file():
+                digests[key] = pack.digest(key, path)
+            else:
+                errors[key] = "file not found"
+
+    pending = {}
+    for key, sha in digests.items():
+        if sha not in pack and sha not in pending:
+            pending[sha] = (sha, str(catalog_dir / key), pack.thumb_size)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for sha, result, error in pool.map(_thumbnail_worker, pending.values(), chunksize=4):
+                if error:
+                    errors.update({key: error for key, digest in digests.items() if digest == sha})
+                    continue
+                size, pixels, source_size = result
+                pack.add(sha, Image.frombytes('RGBA', size, pixels), source_size)
+    return digests, len(pending), errors
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size)
+    except (TypeError, OSError):
+        # Older Pillow or no FreeType: the fixed bitmap font
+        return ImageFont.load_default()
+
+def _checkerboard(size, square=8):
+    """Light checkerboard shown behind transparent thumbnails"""
+    board = Image.new('RGBA', (size, size), (255, 255, 255, 255))
+    draw = ImageDraw.Draw(board)
+    for y in range(0, size, square):
+        for x in range((y // square) % 2 * square, size, square * 2):
+            draw.rectangle([x, y, x + square - 1, y + square - 1], fill=(232, 232, 236, 255))
+    return board
+
+class SheetLayout:
+    """Tile and font metrics shared by every panel of a sheet"""
+
+    def __init__(self, thumb_size, columns):
+        self.thumb_size = thumb_size
+        self.columns = columns
+        self.label_font = _font(max(9, thumb_size // 9))
+        self.heading_font = _font(max(12, thumb_size // 6))
+        self.line_height = self.label_font.getbbox("Ag")[3] + 3
+        self.heading_height = self.heading_font.getbbox("Ag")[3] + PADDING
+        self.tile_width = thumb_size + PADDING * 2
+        self.tile_height = thumb_size + PADDING + self.line_height * LABEL_LINES + PADDING
+        self.width = self.tile_width * columns + PADDING * 2
+        self.backdrop = _checkerboard(thumb_size)
+
+    def panel_height(self, tile_count):
+        rows = max(1, -(-tile_count // self.columns))
+        return PADDING + self.heading_height + rows * self.tile_height
+
+def _fit_text(draw, text, font, width):
+    """Shorten text with an ellipsis until it fits width"""
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > width:
+        text = text[:-1]
+    return text + "…"
+
+def render_panel(name, tiles, layout, pack, digests, errors):
+    """Draw one catalog entry: its name and a labeled tile per image or color"""
+    panel = Image.new('RGBA', (layout.width, layout.panel_height(len(tiles))), BACKGROUND)
+    draw = ImageDraw.Draw(panel)
+    draw.text((PADDING, PADDING), f"{name}  ({len(tiles)})", font=layout.heading_font, fill=HEADING)
+
+    size = layout.thumb_size
+    for i, tile in enumerate(tiles):
+        row, column = divmod(i, layout.columns)
+        x = PADDING + column * layout.tile_width + PADDING
+        y = PADDING + layout.heading_height + row * layout.tile_height
+        panel.paste(layout.backdrop, (x, y))
+
+        key = tile["file"]
+        note = tile["note"]
+        if tile["color"]:
+            draw.rectangle([x, y, x + size - 1, y + size - 1], fill=tile["color"])
+        elif key in digests and digests[key] in pack:
+            thumb, (width, height) = pack.get(digests[key])
+            panel.alpha_composite(thumb, (x + (size - thumb.width) // 2, y + (size - thumb.height) // 2))
+            note = f"{width}x{height}px {note}".strip()
+        elif key is not None:
+            draw.line([x, y, x + size - 1, y + size - 1], fill=(255, 59, 48, 255), width=2)
+            note = errors.get(key, "not decoded")
+        draw.rectangle([x, y, x + size - 1, y + size - 1], outline=(209, 209, 214, 255))
+
+        text_y = y + size + PADDING // 2
+        for line in (tile["label"], note):
+            draw.text((x, text_y), _fit_text(draw, line, layout.label_font, size),
+                      font=layout.label_font, fill=LABEL)
+            text_y += layout.line_height
+    return panel
+
+def render_sheet(entries, layout, pack, digests, errors, workers=None):
+    """Draw every entry's panel in parallel and stack them into one sheet"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        panels = list(pool.map(lambda entry: render_panel(*entry, layout, pack, digests, errors), entries))
+    sheet = Image.new('RGB', (layout.width, sum(p.height for p in panels) + PADDING), BACKGROUND[:3])
+    y = 0
+    for panel in panels:
+        sheet.paste(panel, (0, y))
+        y += panel.height
+    return sheet
+
+def main():
+    """Build the catalog preview sheet, regenerating only changed thumbnails"""
+    parser = argparse.ArgumentParser(description="Labeled preview sheet of an asset catalog")
+    parser.add_argument("catalog", nargs="?", default=str(DEFAULT_CATALOG),
+                        help="Path to the .xcassets directory")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="Sheet PNG to write")
+    parser.add_argument("--pack", default=str(DEFAULT_PACK),
+                        help="Thumbnail pack file (keyed by file hash)")
+    parser.add_argument("--thumb-size", type=int, default=96, help="Tile size in pixels (default: 96)")
+    parser.add_argument("--columns", type=int, default=12, help="Tiles per row (default: 12)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Thumbnail processes and drawing threads (default: CPU count)")
+    args = parser.parse_args()
+
+    catalog_dir = Path(args.catalog)
+    if not catalog_dir.is_dir():
+        print(f"❌ Asset catalog not found: {catalog_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    entries = read_entries(catalog_dir)
+    pack = ThumbnailPack(args.pack, args.thumb_size)
+    digests, regenerated, errors = update_thumbnails(catalog_dir, entries, pack, args.workers)
+    output = Path(args.output)
+    sheet_key = hashlib.sha256(json.dumps(
+        [PACK_VERSION, args.thumb_size, args.columns, entries, digests, errors], sort_keys=True
+    ).encode()).hexdigest()
+    try:
+        up_to_date = pack.sheet == {"key": sheet_key, "path": str(output),
+                                    "mtime_ns": output.stat().st_mtime_ns}
+    except OSError:
+        up_to_date = False
+
+    if not up_to_date:
+        layout = SheetLayout(args.thumb_size, args.columns)
+        sheet = render_sheet(entries, layout, pack, digests, errors, args.workers)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        # The sheet is rewritten whenever the catalog changes; favour speed
+        sheet.save(output, compress_level=1)
+    rewritten = pack.save(digests, set(digests.values()), {
+        "key": sheet_key, "path": str(output), "mtime_ns": output.stat().st_mtime_ns})
+    pack.close()
+
+    tiles = sum(len(t) for _, t in entries)
+    status = "already up to date" if up_to_date else "written"
+    print(f"🖼  {output}: {tiles} tiles from {len(entries)} entries {status} "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(f"   Thumbnails: {len(set(digests.values())) - regenerated} cached, {regenerated} regenerated"
+          + (", pack rewritten" if rewritten else ""))
+    for key, error in errors.items():
+        print(f"⚠️  {key}: {error}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Color-managed loading of source artwork for Kansyl assets
+Converts masters with an embedded ICC profile (Display P3, Adobe RGB, ...)
+into the catalog's working space once, before any resizing
+
+ImageCms transforms are expensive to build, so they are cached by
+(source profile hash, target space, rendering intent, modes) and shared by
+every image and thread in the process.
+"""
+
+import io
+import os
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+# Check if Pillow is installed
+try:
+    from PIL import ImageCms
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import ImageCms
+
+from safe_decode import SandboxedDecoder
+
+COLOR_SPACES = ["srgb", "display-p3"]
+
+# Where to find a Display P3 profile; set KANSYL_DISPLAY_P3_ICC on machines
+# without the macOS ColorSync profiles (e.g. Linux CI)
+DISPLAY_P3_PATHS = [
+    "/System/Library/ColorSync/Profiles/Display P3.icc",
+    "/Library/ColorSync/Profiles/Display P3.icc",
+]
+
+DEFAULT_INTENT = ImageCms.Intent.PERCEPTUAL
+
+# Converted masters kept in memory (least recently used dropped first);
+# large masters are tens of MB each once decoded
+MAX_MASTERS = 4
+
+_lock = threading.Lock()
+_profiles = {}
+_transforms = {}
+_masters = OrderedDict()
+_stats = {"transform_hits": 0, "transform_builds": 0}
+
+def target_profile(color_space):
+    """ImageCms profile and ICC bytes for a working color space"""
+    with _lock:
+        if color_space in _profiles:
+            return _profiles[color_space]
+
+    if color_space == "srgb":
+        profile = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+    elif color_space == "display-p3":
+        paths = [os.environ.get("KANSYL_DISPLAY_P3_ICC")] + DISPLAY_P3_PATHS
+        path = next((p for p in paths if p and Path(p).exists()), None)
+        if path is None:
+            raise FileNotFoundError(
+                "No Display P3 ICC profile found; set KANSYL_DISPLAY_P3_ICC to its path"
+            )
+        profile = ImageCms.getOpenProfile(path)
+    else:
+        raise ValueError(f"Unknown color space: {color_space} (expected one of {COLOR_SPACES})")
+
+    entry = (profile, profile.tobytes())
+    with _lock:
+        _profiles[color_space] = entry
+    return entry
+
+def _transform(icc_bytes, color_space, intent, in_mode, out_mode):
+    """Build or reuse the transform from an embedded profile to a color space"""
+    key = (hashlib.sha256(icc_bytes).hexdigest(), color_space, int(intent), in_mode, out_mode)
+    with _lock:
+        transform = _transforms.get(key)
+        if transform is not None:
+            _stats["transform_hits"] += 1
+            return transform
+
+    source = ImageCms.ImageCmsProfile(io.BytesIO(icc_bytes))
+    target, _ = target_profile(color_space)
+    transform = ImageCms.buildTransform(source, target, in_mode, out_mode, intent)
+
+    with _lock:
+        # Another thread may have built the same transform meanwhile; keep one
+        transform = _transforms.setdefault(key, transform)
+        _stats["transform_builds"] += 1
+    return transform
+
+def to_working_space(img, color_space="srgb", intent=DEFAULT_INTENT):
+    """Convert an image to RGBA in the given working color space
+
+    Images without an embedded profile are treated as sRGB. Display P3
+    output carries the target profile in img.info so it is embedded when
+    saved; sRGB output carries no profile (sRGB is the default).
+    """
+    icc_bytes = img.info.get("icc_profile")
+    if not icc_bytes:
+        if color_space == "srgb":
+            converted = img if img.mode == 'RGBA' else img.convert('RGBA')
+            converted.info.pop("icc_profile", None)
+            return converted
+        # Untagged artwork is sRGB; move it into the wider space
+        icc_bytes = target_profile("srgb")[1]
+
+    # Little CMS handles these modes directly; anything else goes via RGBA
+    if img.mode not in ('RGB', 'RGBA', 'CMYK', 'L'):
+        img = img.convert('RGBA')
+    in_mode = img.mode
+    out_mode = 'RGBA' if in_mode == 'RGBA' else 'RGB'
+
+    converted = ImageCms.applyTransform(img, _transform(icc_bytes, color_space, intent, in_mode, out_mode))
+    if converted.mode != 'RGBA':
+        converted = converted.convert('RGBA')
+
+    if color_space == "srgb":
+        converted.info.pop("icc_profile", None)
+    else:
+        converted.info["icc_profile"] = target_profile(color_space)[1]
+    return converted
+
+def load_master(path, color_space="srgb", intent=DEFAULT_INTENT, decoder=None):
+    """Decode and color-convert a source image, once per file version
+
+    The file is decoded by decoder (a safe_decode.SandboxedDecoder), or by
+    a single-worker one started for this call, never in this process.
+
+    The converted master is remembered by (path, mtime, size, color space,
+    intent), so resizing one source to many sizes converts it only once.
+    Only the MAX_MASTERS most recently used are kept, and a new version of
+    a file replaces the old ones. Callers must not modify the returned
+    image in place.
+    """
+    stat = os.stat(path)
+    key = (str(path), stat.st_mtime_ns, stat.st_size, color_space, int(intent))
+    with _lock:
+        master = _masters.get(key)
+        if master is not None:
+            _masters.move_to_end(key)
+    if master is None:
+        if decoder is None:
+            with SandboxedDecoder(1) as own:
+                img = own.decode_file(path)
+        else:
+            img = decoder.decode_file(path)
+        master = to_working_space(img, color_space, intent)
+        with _lock:
+            # Older versions of this file will never be asked for again
+            for stale in [k for k in _masters if k[0] == key[0] and k[1:3] != key[1:3]]:
+                del _masters[stale]
+            master = _masters.setdefault(key, master)
+            _masters.move_to_end(key)
+            while len(_masters) > MAX_MASTERS:
+                _masters.popitem(last=False)
+    return master
+
+def transform_stats():
+    """Counts of transforms built and reused so far"""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Duplicate image finder for the Kansyl asset catalog
+Hashes the decoded pixels of every PNG, reports exact and near duplicates
+and the bytes that could be reclaimed
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Check if Pillow is installed
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CATALOG = BASE_DIR / "kansyl" / "Assets.xcassets"
+DEFAULT_CACHE = BASE_DIR / ".asset_cache" / "pixel_hashes.json"
+
+# Bump when the hashing scheme changes so old cache entries are ignored
+CACHE_VERSION = 1
+
+def hash_image(path):
+    """Hash the decoded pixels of an image
+
+    Returns the exact pixel hash, a 64-bit difference hash used for near
+    duplicate matching, and the image dimensions.
+    """
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+        width, height = img.size
+        digest = hashlib.sha256()
+        digest.update(f"{width}x{height}".encode())
+        digest.update(img.tobytes())
+
+        # Difference hash on a 9x8 grayscale thumbnail, flattened onto white
+        # so fully transparent pixels compare equal regardless of their RGB
+        flat = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        flat.alpha_composite(img)
+        thumb = flat.convert('L').resize((9, 8), Image.Resampling.BILINEAR)
+        pixels = thumb.tobytes()
+        dhash = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                dhash = (dhash << 1) | (1 if left > right else 0)
+
+    return {
+        "pixel_hash": digest.hexdigest(),
+        "dhash": f"{dhash:016x}",
+        "width": width,
+        "height": height,
+    }
+
+def _hash_worker(path):
+    """Process pool entry point; errors are returned instead of raised"""
+    try:
+        return str(path), hash_image(path), None
+    except Exception as e:
+        return str(path), None, str(e)
+
+def load_cache(cache_path):
+    """Load the hash cache, discarding it if the format changed"""
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION:
+            return cache["entries"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+def save_cache(cache_path, entries):
+    """Write the hash cache atomically"""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+    os.replace(tmp_path, cache_path)
+
+def scan_catalog(catalog_dir, cache_path, workers=None):
+    """Hash every PNG in the catalog, reusing cached hashes
+
+    A cached hash is reused when the file's mtime and size are unchanged.
+    Returns (records, errors, cache_hits).
+    """
+    cache = load_cache(cache_path)
+    records = {}
+    pending = []
+
+    for path in sorted(catalog_dir.rglob("*.png")):
+        key = str(path.relative_to(catalog_dir))
+        stat = path.stat()
+        cached = cache.get(key)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["bytes"] == stat.st_size:
+            records[key] = cached
+        else:
+            pending.append((key, path, stat))
+
+    errors = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_hash_worker, [path for _, path, _ in pending], chunksize=4)
+            for (key, _, stat), (_, result, error) in zip(pending, results):
+                if error:
+                    errors[key] = error
+                    continue
+                result["mtime_ns"] = stat.st_mtime_ns
+                result["bytes"] = stat.st_size
+                records[key] = result
+
+    save_cache(cache_path, records)
+    return records, errors, len(records) - (len(pending) - len(errors))
+
+def find_exact_duplicates(records):
+    """Group images whose decoded pixels are identical"""
+    groups = {}
+    for key, record in records.items():
+        groups.setdefault(record["pixel_hash"], []).append(key)
+    return [sorted(keys) for keys in groups.values() if len(keys) > 1]
+
+def find_near_duplicates(records, exact_groups, max_distance):
+    """Group same-sized images whose difference hashes are within max_distance bits
+
+    Images already in an exact group are represented by their first member
+    so exact copies don't show up again as near duplicates.
+    """
+    skip = {key for group in exact_groups for key in group[1:]}
+    by_size = {}
+    for key, record in records.items():
+        if key not in skip:
+            by_size.setdefault((record["width"], record["height"]), []).append(key)
+
+    groups = []
+    for keys in by_size.values():
+        keys.sort()
+        seen = set()
+        for i, key in enumerate(keys):
+            if key in seen:
+                continue
+            base = int(records[key]["dhash"], 16)
+            group = [key]
+            for other in keys[i + 1:]:
+                if other in seen or records[other]["pixel_hash"] == records[key]["pixel_hash"]:
+                    continue
+                distance = bin(base ^ int(records[other]["dhash"], 16)).count("1")
+                if distance <= max_distance:
+                    group.append(other)
+            if len(group) > 1:
+                seen.update(group)
+                groups.append(group)
+    return groups
+
+def reclaimable_bytes(records, groups):
+    """Bytes saved by keeping only the first file of each group"""
+    return sum(records[key]["bytes"] for group in groups for key in group[1:])
+
+def collapsible_groups(exact_groups):
+    """Split exact groups into per-set groups that Xcode can share a file within"""
+    groups = []
+    for group in exact_groups:
+        by_set = {}
+        for key in group:
+            by_set.setdefault(str(Path(key).parent), []).append(key)
+        for set_dir, keys in by_set.items():
+            if len(keys) > 1 and set_dir.endswith((".appiconset", ".imageset")):
+                groups.append(keys)
+    return groups
+
+def collapse_exact_duplicates(catalog_dir, exact_groups):
+    """Point duplicate entries at one shared file within each set
+
+    Xcode lets several Contents.json entries of the same .appiconset or
+    .imageset reference one file, but files can't be shared between sets,
+    so only duplicates that live in the same set directory are collapsed.
+    Returns the list of removed files.
+    """
+    removed = []
+    for keys in collapsible_groups(exact_groups):
+        set_dir = Path(keys[0]).parent
+        contents_path = catalog_dir / set_dir / "Contents.json"
+        if not contents_path.exists():
+            continue
+
+        keep = Path(keys[0]).name
+        drop = {Path(key).name for key in keys[1:]}
+        with open(contents_path) as f:
+            contents = json.load(f)
+        for image in contents.get("images", []):
+            if image.get("filename") in drop:
+                image["filename"] = keep
+
+        tmp_path = contents_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(contents, f, indent=2)
+        os.replace(tmp_path, contents_path)
+
+        for name in sorted(drop):
+            (catalog_dir / set_dir / name).unlink()
+            removed.append(f"{set_dir}/{name}")
+    return removed
+
+def main():
+    """Scan the asset catalog and report duplicate images"""
+    parser = argparse.ArgumentParser(description="Find duplicate images in an asset catalog")
+    parser.add_argument("catalog", nargs="?", default=str(DEFAULT_CATALOG),
+                        help="Path to the .xcassets directory")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE),
+                        help="Hash cache file (keyed by path, mtime and size)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of hashing processes (default: CPU count)")
+    parser.add_argument("--max-distance", type=int, default=4,
+                        help="Max differing hash bits for near duplicates (default: 4)")
+    parser.add_argument("--collapse", action="store_true",
+                        help="Share one file between exact duplicates in the same set")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the report as JSON")
+    args = parser.parse_args()
+
+    catalog_dir = Path(args.catalog)
+    if not catalog_dir.is_dir():
+        print(f"❌ Asset catalog not found: {catalog_dir}")
+        sys.exit(1)
+
+    records, errors, cache_hits = scan_catalog(catalog_dir, Path(args.cache), args.workers)
+    exact_groups = find_exact_duplicates(records)
+    near_groups = find_near_duplicates(records, exact_groups, args.max_distance)
+    total_bytes = sum(record["bytes"] for record in records.values())
+
+    if args.json:
+        print(json.dumps({
+            "images": len(records),
+            "total_bytes": total_bytes,
+            "exact_duplicates": exact_groups,
+            "exact_reclaimable_bytes": reclaimable_bytes(records, exact_groups),
+            "collapsible_bytes": reclaimable_bytes(records, collapsible_groups(exact_groups)),
+            "near_duplicates": near_groups,
+            "near_reclaimable_bytes": reclaimable_bytes(records, near_groups),
+            "errors": errors,
+        }, indent=2))
+    else:
+        print(f"🔍 Scanned {len(records)} images ({total_bytes:,} bytes) in {catalog_dir}")
+        print(f"   Cache hits: {cache_hits}/{len(records)}")
+
+        print(f"\n🟰 Exact duplicates: {len(exact_groups)} groups")
+        for group in exact_groups:
+            print(f"   • {group[0]} ({records[group[0]]['bytes']:,} bytes)")
+            for key in group[1:]:
+                print(f"       = {key}")
+
+        print(f"\n≈ Near duplicates: {len(near_groups)} groups")
+        for group in near_groups:
+            print(f"   • {group[0]}")
+            for key in group[1:]:
+                print(f"       ≈ {key}")
+
+        print("\n📊 Reclaimable:")
+        print(f"   Exact duplicates: {reclaimable_bytes(records, exact_groups):,} bytes")
+        print(f"   Near duplicates:  {reclaimable_bytes(records, near_groups):,} bytes")
+        print(f"   Collapsible within a set (--collapse): "
+              f"{reclaimable_bytes(records, collapsible_groups(exact_groups)):,} bytes")
+
+        for key, error in errors.items():
+            print(f"⚠️  Could not decode {key}: {error}")
+
+    if args.collapse:
+        removed = collapse_exact_duplicates(catalog_dir, exact_groups)
+        print(f"\n🧹 Collapsed {len(removed)} duplicate files into shared references")
+        for key in removed:
+            print(f"   - {key}")
+
+if __name__ == "__main__":
+    main()
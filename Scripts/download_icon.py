@@ -7,6 +7,8 @@ import urllib.request
 import os
 from pathlib import Path
 
+from safe_decode import DecodeRejected, SandboxedDecoder
+
 def download_icon():
     # The URL of the icon image
     url = "https://storage.googleapis.com/flutterflow-io-6f20.appspot.com/projects/remind-me-byjwh5/assets/t06jm8bq9xol/app_icon.png"
@@ -23,10 +25,22 @@ def download_icon():
         print(f"   From: {url}")
         print(f"   To: {output_path}")
         
-        # Download the image
-        urllib.request.urlretrieve(url, output_path)
+        # Download the image, checking it decodes before anything is saved;
+        # error pages served with a .png name are caught here
+        with SandboxedDecoder(1) as decoder:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read(decoder.limits.max_bytes + 1)
+            try:
+                img = decoder.decode(data, url)
+            except DecodeRejected as e:
+                print(f"❌ Downloaded file is not a usable image: {e.reason}")
+                print(f"   Quarantined as: {e.quarantined}")
+                return None
+        
+        with open(output_path, 'wb') as f:
+            f.write(data)
         
-        print(f"✅ Icon successfully downloaded!")
+        print(f"✅ Icon successfully downloaded! ({img.width}x{img.height})")
         print(f"📁 Saved to: {output_path}")
         
         # Check file size
@@ -44,4 +58,6 @@ if __name__ == "__main__":
     
     if icon_path:
         print("\n🎯 Next step:")
-        print(f"   python3 Scripts/resize_app_icon.py '{icon_path}'")
\ No newline at end of file
+        print(f"   python3 Scripts/resize_app_icon.py '{icon_path}'")
+        print("\n💡 Or download and resize in one non-interactive run:")
+        print("   python3 Scripts/asset_pipeline.py --app-icon <url-or-path>")
\ No newline at end of file
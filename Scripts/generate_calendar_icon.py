@@ -5,6 +5,7 @@ Creates an app icon with a calendar/cancel theme
 """
 
 import os
+import sys
 import json
 from pathlib import Path
 
@@ -17,10 +18,21 @@ except ImportError:
     os.system("pip3 install Pillow")
     from PIL import Image, ImageDraw, ImageFont
 
-def create_calendar_icon(size, output_path):
-    """Create a calendar-themed icon for Kansyl"""
-    
-    # Create a new image
+from artifact_cache import cached_pngs, default_cache, write_output
+from antialias import Layer, measure_lod, print_lod_report, print_report, render_layers
+from icon_appearances import (
+    APPEARANCES, appearance_entries, appearance_filename, compose_appearances, config_appearances
+)
+
+# Files whose contents determine the rendered pixels (artifact cache key)
+CACHE_SOURCES = [
+    Path(__file__),
+    Path(__file__).with_name("antialias.py"),
+    Path(__file__).with_name("icon_appearances.py"),
+]
+
+def draw_calendar_background(size):
+    """Draw the gradient background layer"""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
@@ -32,82 +44,132 @@ def create_calendar_icon(size, output_path):
         b = int(114 * (1 - ratio) + 157 * ratio)
         draw.line([(0, i), (size, i)], fill=(r, g, b))
     
-    # Calendar base
+    return img
+
+def calendar_geometry(size):
+    """Shared calendar layout in logical pixels"""
     calendar_margin = size * 0.15
     calendar_width = size - (calendar_margin * 2)
     calendar_height = calendar_width * 0.9
     calendar_x = calendar_margin
     calendar_y = (size - calendar_height) / 2
+    header_height = calendar_height * 0.2
+    grid_start_y = calendar_y + header_height + (calendar_height * 0.1)
+    grid_height = calendar_height * 0.6
+    return {
+        "margin": calendar_margin,
+        "x": calendar_x,
+        "y": calendar_y,
+        "width": calendar_width,
+        "height": calendar_height,
+        "header_height": header_height,
+        "grid_y": grid_start_y,
+        "grid_height": grid_height,
+        # The trial end date marked with a circle and an X
+        "circle_x": calendar_x + calendar_width * 0.72,
+        "circle_y": grid_start_y + grid_height * 0.3,
+        "circle_radius": calendar_width * 0.08,
+    }
+
+def draw_calendar_body(draw, size, k):
+    """Calendar card and red header"""
+    c = calendar_geometry(size)
     
     # Calendar background
     draw.rounded_rectangle(
-        [calendar_x, calendar_y, calendar_x + calendar_width, calendar_y + calendar_height],
-        radius=size // 20,
+        [c["x"] * k, c["y"] * k, (c["x"] + c["width"]) * k, (c["y"] + c["height"]) * k],
+        radius=size // 20 * k,
         fill=(255, 255, 255, 240),
-        outline=(255, 255, 255)
+        outline=(255, 255, 255),
+        width=k
     )
     
     # Calendar header (red for urgency)
-    header_height = calendar_height * 0.2
     draw.rounded_rectangle(
-        [calendar_x, calendar_y, calendar_x + calendar_width, calendar_y + header_height],
-        radius=size // 20,
+        [c["x"] * k, c["y"] * k, (c["x"] + c["width"]) * k, (c["y"] + c["header_height"]) * k],
+        radius=size // 20 * k,
         fill=(255, 59, 48)
     )
-    
-    # Draw calendar grid lines
-    grid_start_y = calendar_y + header_height + (calendar_height * 0.1)
-    grid_height = calendar_height * 0.6
+
+def draw_calendar_grid(draw, size, k):
+    """Thin day grid lines"""
+    c = calendar_geometry(size)
+    line_width = max(1, size // 300) * k
     
     # Vertical lines
     for i in range(1, 7):
-        x_pos = calendar_x + (calendar_width * i / 7)
+        x_pos = c["x"] + (c["width"] * i / 7)
         draw.line(
-            [(x_pos, grid_start_y), (x_pos, grid_start_y + grid_height)],
+            [(x_pos * k, c["grid_y"] * k), (x_pos * k, (c["grid_y"] + c["grid_height"]) * k)],
             fill=(200, 200, 200),
-            width=max(1, size // 300)
+            width=line_width
         )
     
     # Horizontal lines
     for i in range(1, 5):
-        y_pos = grid_start_y + (grid_height * i / 5)
+        y_pos = c["grid_y"] + (c["grid_height"] * i / 5)
         draw.line(
-            [(calendar_x + calendar_width * 0.05, y_pos), 
-             (calendar_x + calendar_width * 0.95, y_pos)],
+            [((c["x"] + c["width"] * 0.05) * k, y_pos * k),
+             ((c["x"] + c["width"] * 0.95) * k, y_pos * k)],
             fill=(200, 200, 200),
-            width=max(1, size // 300)
+            width=line_width
         )
-    
-    # Add a circled date (trial end date)
-    circle_x = calendar_x + calendar_width * 0.72
-    circle_y = grid_start_y + grid_height * 0.3
-    circle_radius = calendar_width * 0.08
-    
-    # Red circle around the date
+
+def draw_calendar_rows(draw, size, k):
+    """Two row lines standing in for the grid on small icons"""
+    c = calendar_geometry(size)
+    for i in (1, 2):
+        y_pos = round(c["grid_y"] + (c["grid_height"] * i / 3))
+        draw.line(
+            [((c["x"] + c["width"] * 0.1) * k, y_pos * k),
+             ((c["x"] + c["width"] * 0.9) * k, y_pos * k)],
+            fill=(200, 200, 200),
+            width=k
+        )
+
+def draw_date_circle(draw, size, k):
+    """Red circle around the trial end date"""
+    c = calendar_geometry(size)
+    x, y, radius = c["circle_x"], c["circle_y"], c["circle_radius"]
     draw.ellipse(
-        [circle_x - circle_radius, circle_y - circle_radius,
-         circle_x + circle_radius, circle_y + circle_radius],
+        [(x - radius) * k, (y - radius) * k, (x + radius) * k, (y + radius) * k],
         outline=(255, 59, 48),
-        width=max(2, size // 100)
+        width=max(2, size // 100) * k
     )
-    
-    # Add X mark over the circled date
-    x_size = circle_radius * 0.6
+
+def draw_date_cross(draw, size, k):
+    """X mark over the circled date"""
+    c = calendar_geometry(size)
+    x, y = c["circle_x"], c["circle_y"]
+    x_size = c["circle_radius"] * 0.6
+    line_width = max(2, size // 100) * k
     draw.line(
-        [(circle_x - x_size, circle_y - x_size), 
-         (circle_x + x_size, circle_y + x_size)],
+        [((x - x_size) * k, (y - x_size) * k),
+         ((x + x_size) * k, (y + x_size) * k)],
         fill=(255, 59, 48),
-        width=max(2, size // 100)
+        width=line_width
     )
     draw.line(
-        [(circle_x - x_size, circle_y + x_size), 
-         (circle_x + x_size, circle_y - x_size)],
+        [((x - x_size) * k, (y + x_size) * k),
+         ((x + x_size) * k, (y - x_size) * k)],
         fill=(255, 59, 48),
-        width=max(2, size // 100)
+        width=line_width
     )
-    
-    # Add "K" branding at the bottom
-    font_size = max(12, int(calendar_height * 0.15))
+
+def draw_date_dot(draw, size, k):
+    """Solid red dot marking the date on small icons"""
+    c = calendar_geometry(size)
+    x, y = c["circle_x"], c["circle_y"]
+    radius = max(1.5, c["circle_radius"])
+    draw.ellipse(
+        [(x - radius) * k, (y - radius) * k, (x + radius) * k, (y + radius) * k],
+        fill=(255, 59, 48)
+    )
+
+def draw_branding(draw, size, k, shadow=True):
+    """"KANSYL" wordmark under the calendar"""
+    c = calendar_geometry(size)
+    font_size = max(12, int(c["height"] * 0.15)) * k
     try:
         font_paths = [
             "/System/Library/Fonts/SFNS.ttc",
@@ -129,16 +191,62 @@ def create_calendar_icon(size, output_path):
     text = "KANSYL"
     bbox = draw.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]
-    text_x = (size - text_width) // 2
-    text_y = calendar_y + calendar_height + (calendar_margin * 0.3)
+    text_x = (size * k - text_width) // 2
+    text_y = (c["y"] + c["height"] + (c["margin"] * 0.3)) * k
     
     # Text shadow
-    draw.text((text_x + 1, text_y + 1), text, fill=(0, 0, 0, 100), font=font)
+    if shadow:
+        draw.text((text_x + k, text_y + k), text, fill=(0, 0, 0, 100), font=font)
     draw.text((text_x, text_y), text, fill='white', font=font)
+
+def draw_branding_flat(draw, size, k):
+    """Wordmark without the shadow, which blurs it at small sizes"""
+    draw_branding(draw, size, k, shadow=False)
+
+# Foreground layers in drawing order. Curves, diagonals and hairlines are
+# supersampled; text is already antialiased by FreeType. Below min_size a
+# layer gives way to its simpler fallback, or is left out: the grid turns
+# into two rows, the circled and crossed date into a dot, and the wordmark
+# loses its shadow and then disappears.
+CALENDAR_LAYERS = [
+    Layer("calendar", draw_calendar_body, antialias=True),
+    Layer("grid", draw_calendar_grid, antialias=True, min_size=58,
+          fallback=Layer("grid rows", draw_calendar_rows, min_size=29)),
+    Layer("date circle", draw_date_circle, antialias=True, min_size=58,
+          fallback=Layer("date dot", draw_date_dot, antialias=True)),
+    Layer("date cross", draw_date_cross, antialias=True, min_size=58),
+    Layer("branding", draw_branding, min_size=120,
+          fallback=Layer("branding flat", draw_branding_flat, min_size=76)),
+]
+
+def draw_calendar_foreground(size, aa_report=None):
+    """Draw the calendar, date mark and branding layer"""
+    return render_layers(size, CALENDAR_LAYERS, report=aa_report)
+
+def create_calendar_icon(size, output_path):
+    """Create a calendar-themed icon for Kansyl"""
+    create_calendar_icon_variants(size, {"light": output_path})
+
+def create_calendar_icon_variants(size, output_paths, aa_report=None, cache=None):
+    """Create several appearances of the icon from one set of layers
+
+    output_paths maps an appearance name ("light", "dark", "tinted") to the
+    file it should be saved to. Pass a list as aa_report to collect
+    per-layer antialiasing timings (only icons that are actually
+    rendered are reported; cache hits are skipped).
+    """
+    def render(appearances):
+        background = draw_calendar_background(size)
+        foreground = draw_calendar_foreground(size, aa_report)
+        return compose_appearances(background, foreground, appearances)
     
-    # Save the image
-    img.save(output_path, 'PNG')
-    print(f"Created: {output_path}")
+    pngs = cached_pngs(cache, CACHE_SOURCES, list(output_paths), render,
+                       generator="calendar", size=size)
+    
+    # Save the images
+    for appearance, output_path in output_paths.items():
+        write_output(output_path, pngs[appearance])
+        print(f"Created: {output_path}")
 
 def main():
     """Generate all required icon sizes"""
@@ -182,6 +290,12 @@ def main():
         }
     }
     
+    # Per-layer antialiasing timings, printed with --aa-report
+    aa_report = [] if "--aa-report" in sys.argv else None
+    # Time saved by level of detail per size tier, printed with --lod-report
+    lod_report = [] if "--lod-report" in sys.argv else None
+    cache = default_cache()
+    
     print("📅 Generating calendar-themed Kansyl app icons...")
     print("✨ Theme: Calendar with cancel mark")
     
@@ -199,30 +313,44 @@ def main():
         else:
             filename = f"icon-{int(size)}x{int(size)}@{scale}x.png"
         
-        # Create the icon
-        output_path = assets_dir / filename
-        create_calendar_icon(actual_size, output_path)
+        # Create every appearance this size needs in one pass
+        output_paths = {
+            appearance: assets_dir / appearance_filename(filename, appearance)
+            for appearance in config_appearances(config)
+        }
+        create_calendar_icon_variants(actual_size, output_paths, aa_report, cache)
+        if lod_report is not None and all(row["size"] != actual_size for row in lod_report):
+            lod_report.append(measure_lod(actual_size, CALENDAR_LAYERS))
         
         # Add to Contents.json
-        contents["images"].append({
+        entry = {
             "filename": filename,
             "idiom": idiom,
             "scale": f"{scale}x",
             "size": f"{int(size) if size % 1 == 0 else size}x{int(size) if size % 1 == 0 else size}"
-        })
+        }
+        contents["images"].extend(appearance_entries(entry))
     
     # Write Contents.json
     contents_path = assets_dir / "Contents.json"
     with open(contents_path, 'w') as f:
         json.dump(contents, f, indent=2)
     
-    print(f"✅ Successfully generated {len(icon_configs)} calendar-themed icons!")
+    if aa_report is not None:
+        print_report(aa_report)
+    if lod_report is not None:
+        print_lod_report(lod_report)
+    if cache is not None:
+        print(cache.summary())
+    
+    print(f"✅ Successfully generated {len(icon_configs)} calendar-themed icons in {len(APPEARANCES)} appearances!")
     print(f"📁 Icons saved to: {assets_dir}")
     print("\n🎯 Design features:")
     print("• Calendar with marked cancellation date")
     print("• Green to teal gradient background")
     print("• Red X mark over trial end date")
     print("• Clean, minimal design")
+    print("• Light, dark and tinted appearances")
     print("\n💡 To use this variant:")
     print("1. Copy the contents from AppIcon-Calendar.appiconset")
     print("2. Replace the files in AppIcon.appiconset")
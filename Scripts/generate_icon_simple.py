@@ -17,10 +17,17 @@ except ImportError:
     os.system("pip3 install Pillow")
     from PIL import Image, ImageDraw, ImageFont
 
-def create_icon(size, output_path):
-    """Create a simple app icon with the letter K"""
-    # Create a new image with a blue gradient background
-    img = Image.new('RGB', (size, size), color=(38, 89, 242))
+from artifact_cache import cached_pngs, default_cache, write_output
+from icon_appearances import (
+    APPEARANCES, appearance_entries, appearance_filename, compose_appearances, config_appearances
+)
+
+# Files whose contents determine the rendered pixels (artifact cache key)
+CACHE_SOURCES = [Path(__file__), Path(__file__).with_name("icon_appearances.py")]
+
+def draw_icon_background(size):
+    """Draw the two-tone blue background layer"""
+    img = Image.new('RGBA', (size, size), color=(38, 89, 242, 255))
     draw = ImageDraw.Draw(img)
     
     # Draw a slightly darker blue rectangle for depth
@@ -29,6 +36,13 @@ def create_icon(size, output_path):
         fill=(31, 71, 204)
     )
     
+    return img
+
+def draw_icon_foreground(size):
+    """Draw the letter and checkmark layer"""
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    
     # Draw the letter "K" in white
     font_size = int(size * 0.5)
     try:
@@ -63,9 +77,30 @@ def create_icon(size, output_path):
         fill=(76, 217, 100)
     )
     
-    # Save the image
-    img.save(output_path, 'PNG')
-    print(f"Created: {output_path}")
+    return img
+
+def create_icon(size, output_path):
+    """Create a simple app icon with the letter K"""
+    create_icon_variants(size, {"light": output_path})
+
+def create_icon_variants(size, output_paths, cache=None):
+    """Create several appearances of the icon from one set of layers
+
+    output_paths maps an appearance name ("light", "dark", "tinted") to the
+    file it should be saved to.
+    """
+    def render(appearances):
+        background = draw_icon_background(size)
+        foreground = draw_icon_foreground(size)
+        return compose_appearances(background, foreground, appearances)
+    
+    pngs = cached_pngs(cache, CACHE_SOURCES, list(output_paths), render,
+                       generator="simple", size=size)
+    
+    # Save the images
+    for appearance, output_path in output_paths.items():
+        write_output(output_path, pngs[appearance])
+        print(f"Created: {output_path}")
 
 def main():
     """Generate all required icon sizes"""
@@ -108,6 +143,8 @@ def main():
         }
     }
     
+    cache = default_cache()
+    
     print("🎨 Generating Kansyl app icons...")
     
     for config in icon_configs:
@@ -124,24 +161,31 @@ def main():
         else:
             filename = f"icon-{int(size)}x{int(size)}@{scale}x.png"
         
-        # Create the icon
-        output_path = assets_dir / filename
-        create_icon(actual_size, output_path)
+        # Create every appearance this size needs in one pass
+        output_paths = {
+            appearance: assets_dir / appearance_filename(filename, appearance)
+            for appearance in config_appearances(config)
+        }
+        create_icon_variants(actual_size, output_paths, cache)
         
         # Add to Contents.json
-        contents["images"].append({
+        entry = {
             "filename": filename,
             "idiom": idiom,
             "scale": f"{scale}x",
             "size": f"{int(size) if size % 1 == 0 else size}x{int(size) if size % 1 == 0 else size}"
-        })
+        }
+        contents["images"].extend(appearance_entries(entry))
     
     # Write Contents.json
     contents_path = assets_dir / "Contents.json"
     with open(contents_path, 'w') as f:
         json.dump(contents, f, indent=2)
     
-    print(f"✅ Successfully generated {len(icon_configs)} app icons!")
+    if cache is not None:
+        print(cache.summary())
+    
+    print(f"✅ Successfully generated {len(icon_configs)} app icons in {len(APPEARANCES)} appearances!")
     print(f"📁 Icons saved to: {assets_dir}")
     print("\n🚀 Next steps:")
     print("1. Open your Xcode project")
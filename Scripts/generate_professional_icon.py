@@ -5,6 +5,7 @@ Creates a beautiful app icon with trial management theme
 """
 
 import os
+import sys
 import json
 import math
 from pathlib import Path
@@ -18,6 +19,19 @@ except ImportError:
     os.system("pip3 install Pillow")
     from PIL import Image, ImageDraw, ImageFont
 
+from artifact_cache import cached_pngs, default_cache, write_output
+from antialias import Layer, measure_lod, print_lod_report, print_report, render_layers
+from icon_appearances import (
+    APPEARANCES, appearance_entries, appearance_filename, compose_appearances, config_appearances
+)
+
+# Files whose contents determine the rendered pixels (artifact cache key)
+CACHE_SOURCES = [
+    Path(__file__),
+    Path(__file__).with_name("antialias.py"),
+    Path(__file__).with_name("icon_appearances.py"),
+]
+
 def create_gradient_background(draw, size, colors):
     """Create a smooth gradient background"""
     for i in range(size):
@@ -28,10 +42,8 @@ def create_gradient_background(draw, size, colors):
         b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
         draw.line([(0, i), (size, i)], fill=(r, g, b))
 
-def create_professional_icon(size, output_path, style="gradient"):
-    """Create a professional app icon for Kansyl"""
-    
-    # Create a new image
+def draw_professional_background(size, style="gradient"):
+    """Draw the background layer in the given style"""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
@@ -56,119 +68,190 @@ def create_professional_icon(size, output_path, style="gradient"):
         bg_color = (74, 144, 226)  # Modern blue
         draw.rounded_rectangle([0, 0, size, size], size//8, fill=bg_color)
     
-    # Draw the main icon element - a stylized clock/calendar hybrid
+    return img
+
+def clock_geometry(size):
+    """Shared clock layout in logical pixels"""
     center_x, center_y = size // 2, size // 2
     icon_size = size * 0.6
-    
-    # Draw clock face background
     clock_radius = int(icon_size * 0.4)
+    return center_x, center_y, clock_radius
+
+def load_font(font_paths, font_size):
+    """Load the first available font, falling back to Pillow's default"""
+    try:
+        font = None
+        for font_path in font_paths:
+            try:
+                font = ImageFont.truetype(font_path, font_size)
+                break
+            except:
+                continue
+        
+        if font is None:
+            font = ImageFont.load_default()
+    except:
+        font = ImageFont.load_default()
+    return font
+
+def badge_geometry(size):
+    """Notification badge position and size in logical pixels"""
+    badge_size = size // 6
+    badge_x = size - badge_size - size // 20
+    badge_y = size // 20
+    return badge_x, badge_y, badge_size
+
+def draw_clock_face(draw, size, k):
+    """Semi-transparent white clock face"""
+    center_x, center_y, clock_radius = clock_geometry(size)
     clock_bg_color = (255, 255, 255, 220)  # Semi-transparent white
     
     # Main clock circle
     draw.ellipse([
-        center_x - clock_radius,
-        center_y - clock_radius,
-        center_x + clock_radius,
-        center_y + clock_radius
-    ], fill=clock_bg_color, outline=(255, 255, 255))
+        (center_x - clock_radius) * k,
+        (center_y - clock_radius) * k,
+        (center_x + clock_radius) * k,
+        (center_y + clock_radius) * k
+    ], fill=clock_bg_color, outline=(255, 255, 255), width=k)
+
+def draw_clock_hands(draw, size, k):
+    """Hands pointing to the "trial ending" position (11:59)"""
+    center_x, center_y, clock_radius = clock_geometry(size)
     
-    # Draw clock hands pointing to "trial ending" position (11:59)
     # Hour hand (shorter, thicker)
     hour_angle = math.radians(-90 + (11 * 30))  # 11 o'clock position
     hour_length = clock_radius * 0.5
     hour_end_x = center_x + hour_length * math.cos(hour_angle)
     hour_end_y = center_y + hour_length * math.sin(hour_angle)
-    draw.line([center_x, center_y, hour_end_x, hour_end_y], 
-              fill=(255, 59, 48), width=max(2, size//150))  # Red for urgency
+    draw.line([center_x * k, center_y * k, hour_end_x * k, hour_end_y * k],
+              fill=(255, 59, 48), width=max(2, size//150) * k)  # Red for urgency
     
     # Minute hand (longer, thinner)
     minute_angle = math.radians(-90 + (59 * 6))  # 59 minutes
     minute_length = clock_radius * 0.7
     minute_end_x = center_x + minute_length * math.cos(minute_angle)
     minute_end_y = center_y + minute_length * math.sin(minute_angle)
-    draw.line([center_x, center_y, minute_end_x, minute_end_y], 
-              fill=(255, 59, 48), width=max(1, size//200))
+    draw.line([center_x * k, center_y * k, minute_end_x * k, minute_end_y * k],
+              fill=(255, 59, 48), width=max(1, size//200) * k)
     
     # Center dot
     center_dot_radius = max(2, size//100)
     draw.ellipse([
-        center_x - center_dot_radius,
-        center_y - center_dot_radius,
-        center_x + center_dot_radius,
-        center_y + center_dot_radius
+        (center_x - center_dot_radius) * k,
+        (center_y - center_dot_radius) * k,
+        (center_x + center_dot_radius) * k,
+        (center_y + center_dot_radius) * k
     ], fill=(255, 59, 48))
+
+def draw_clock_hands_bold(draw, size, k):
+    """Two thick hands without the center dot, for small icons"""
+    center_x, center_y, clock_radius = clock_geometry(size)
+    width = max(2, size // 20) * k
+    for angle, length in ((-90 + 11 * 30, 0.5), (-90 + 59 * 6, 0.7)):
+        end_x = center_x + clock_radius * length * math.cos(math.radians(angle))
+        end_y = center_y + clock_radius * length * math.sin(math.radians(angle))
+        draw.line([center_x * k, center_y * k, end_x * k, end_y * k],
+                  fill=(255, 59, 48), width=width)
+
+def draw_letter(draw, size, k, shadow=True):
+    """"K" letter in the lower portion of the clock"""
+    center_x, center_y, clock_radius = clock_geometry(size)
     
-    # Add "K" letter in the lower portion
-    font_size = max(10, int(size * 0.25))
-    try:
-        # Try to use San Francisco font (iOS system font)
-        font_paths = [
-            "/System/Library/Fonts/SFNS.ttc",
-            "/System/Library/Fonts/SF-Pro.ttc",
-            "/System/Library/Fonts/Helvetica.ttc",
-            "/System/Library/Fonts/Arial.ttf"
-        ]
-        font = None
-        for font_path in font_paths:
-            try:
-                font = ImageFont.truetype(font_path, font_size)
-                break
-            except:
-                continue
-        
-        if font is None:
-            font = ImageFont.load_default()
-    except:
-        font = ImageFont.load_default()
+    # Try to use San Francisco font (iOS system font)
+    font = load_font([
+        "/System/Library/Fonts/SFNS.ttc",
+        "/System/Library/Fonts/SF-Pro.ttc",
+        "/System/Library/Fonts/Helvetica.ttc",
+        "/System/Library/Fonts/Arial.ttf"
+    ], max(10, int(size * 0.25)) * k)
     
     text = "K"
     # Get text dimensions
     bbox = draw.textbbox((0, 0), text, font=font)
     text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
     
     # Position text in lower part of icon
-    text_x = center_x - text_width // 2
-    text_y = center_y + clock_radius // 2
+    text_x = center_x * k - text_width // 2
+    text_y = (center_y + clock_radius // 2) * k
     
     # Draw text with subtle shadow
-    shadow_offset = max(1, size//200)
-    draw.text((text_x + shadow_offset, text_y + shadow_offset), text, 
-              fill=(0, 0, 0, 100), font=font)
+    if shadow:
+        shadow_offset = max(1, size//200) * k
+        draw.text((text_x + shadow_offset, text_y + shadow_offset), text, 
+                  fill=(0, 0, 0, 100), font=font)
     draw.text((text_x, text_y), text, fill='white', font=font)
+
+def draw_letter_flat(draw, size, k):
+    """"K" without the shadow, which smears it at small sizes"""
+    draw_letter(draw, size, k, shadow=False)
+
+def draw_badge(draw, size, k):
+    """Red notification badge in the corner"""
+    badge_x, badge_y, badge_size = badge_geometry(size)
+    draw.ellipse([
+        badge_x * k, badge_y * k,
+        (badge_x + badge_size) * k, (badge_y + badge_size) * k
+    ], fill=(255, 59, 48))
+
+def draw_badge_mark(draw, size, k):
+    """"!" inside the notification badge"""
+    badge_x, badge_y, badge_size = badge_geometry(size)
+    badge_font = load_font(["/System/Library/Fonts/Helvetica.ttc"],
+                           max(8, badge_size // 2) * k)
     
-    # Add small notification badge in corner (optional)
-    if size >= 60:  # Only for larger icons
-        badge_size = size // 6
-        badge_x = size - badge_size - size // 20
-        badge_y = size // 20
-        
-        # Red notification badge
-        draw.ellipse([
-            badge_x, badge_y,
-            badge_x + badge_size, badge_y + badge_size
-        ], fill=(255, 59, 48))
-        
-        # Badge number (optional)
-        badge_font_size = max(8, badge_size // 2)
-        try:
-            badge_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", badge_font_size)
-        except:
-            badge_font = ImageFont.load_default()
-        
-        badge_text = "!"
-        badge_bbox = draw.textbbox((0, 0), badge_text, font=badge_font)
-        badge_text_width = badge_bbox[2] - badge_bbox[0]
-        badge_text_height = badge_bbox[3] - badge_bbox[1]
-        
-        badge_text_x = badge_x + (badge_size - badge_text_width) // 2
-        badge_text_y = badge_y + (badge_size - badge_text_height) // 2
-        
-        draw.text((badge_text_x, badge_text_y), badge_text, fill='white', font=badge_font)
+    badge_text = "!"
+    badge_bbox = draw.textbbox((0, 0), badge_text, font=badge_font)
+    badge_text_width = badge_bbox[2] - badge_bbox[0]
+    badge_text_height = badge_bbox[3] - badge_bbox[1]
+    
+    badge_text_x = (badge_x * k) + (badge_size * k - badge_text_width) // 2
+    badge_text_y = (badge_y * k) + (badge_size * k - badge_text_height) // 2
     
-    # Save the image
-    img.save(output_path, 'PNG')
-    print(f"Created: {output_path}")
+    draw.text((badge_text_x, badge_text_y), badge_text, fill='white', font=badge_font)
+
+# Foreground layers in drawing order. Circles and the angled clock hands are
+# supersampled; text is already antialiased by FreeType. Below min_size a
+# layer gives way to its simpler fallback, or is left out: the hands get
+# thicker, the letter loses its shadow and the badge only shows on larger
+# icons.
+PROFESSIONAL_LAYERS = [
+    Layer("clock face", draw_clock_face, antialias=True),
+    Layer("clock hands", draw_clock_hands, antialias=True, min_size=58,
+          fallback=Layer("clock hands bold", draw_clock_hands_bold, antialias=True)),
+    Layer("letter", draw_letter, min_size=58,
+          fallback=Layer("letter flat", draw_letter_flat)),
+    Layer("badge", draw_badge, antialias=True, min_size=60),
+    Layer("badge mark", draw_badge_mark, min_size=60),
+]
+
+def draw_professional_foreground(size, aa_report=None):
+    """Draw the clock, branding and badge layer"""
+    return render_layers(size, PROFESSIONAL_LAYERS, report=aa_report)
+
+def create_professional_icon(size, output_path, style="gradient"):
+    """Create a professional app icon for Kansyl"""
+    create_professional_icon_variants(size, {"light": output_path}, style)
+
+def create_professional_icon_variants(size, output_paths, style="gradient", aa_report=None, cache=None):
+    """Create several appearances of the icon from one set of layers
+
+    output_paths maps an appearance name ("light", "dark", "tinted") to the
+    file it should be saved to. Pass a list as aa_report to collect
+    per-layer antialiasing timings (only icons that are actually
+    rendered are reported; cache hits are skipped).
+    """
+    def render(appearances):
+        background = draw_professional_background(size, style)
+        foreground = draw_professional_foreground(size, aa_report)
+        return compose_appearances(background, foreground, appearances)
+    
+    pngs = cached_pngs(cache, CACHE_SOURCES, list(output_paths), render,
+                       generator="professional", size=size, style=style)
+    
+    # Save the images
+    for appearance, output_path in output_paths.items():
+        write_output(output_path, pngs[appearance])
+        print(f"Created: {output_path}")
 
 def main():
     """Generate all required icon sizes"""
@@ -211,6 +294,12 @@ def main():
         }
     }
     
+    # Per-layer antialiasing timings, printed with --aa-report
+    aa_report = [] if "--aa-report" in sys.argv else None
+    # Time saved by level of detail per size tier, printed with --lod-report
+    lod_report = [] if "--lod-report" in sys.argv else None
+    cache = default_cache()
+    
     print("🎨 Generating professional Kansyl app icons...")
     print("📱 Theme: Free trial management with time urgency")
     
@@ -228,25 +317,38 @@ def main():
         else:
             filename = f"icon-{int(size)}x{int(size)}@{scale}x.png"
         
-        # Create the icon
-        output_path = assets_dir / filename
+        # Create every appearance this size needs in one pass
+        output_paths = {
+            appearance: assets_dir / appearance_filename(filename, appearance)
+            for appearance in config_appearances(config)
+        }
         style = "gradient" if actual_size >= 40 else "minimal"
-        create_professional_icon(actual_size, output_path, style)
+        create_professional_icon_variants(actual_size, output_paths, style, aa_report, cache)
+        if lod_report is not None and all(row["size"] != actual_size for row in lod_report):
+            lod_report.append(measure_lod(actual_size, PROFESSIONAL_LAYERS))
         
         # Add to Contents.json
-        contents["images"].append({
+        entry = {
             "filename": filename,
             "idiom": idiom,
             "scale": f"{scale}x",
             "size": f"{int(size) if size % 1 == 0 else size}x{int(size) if size % 1 == 0 else size}"
-        })
+        }
+        contents["images"].extend(appearance_entries(entry))
     
     # Write Contents.json
     contents_path = assets_dir / "Contents.json"
     with open(contents_path, 'w') as f:
         json.dump(contents, f, indent=2)
     
-    print(f"✅ Successfully generated {len(icon_configs)} professional app icons!")
+    if aa_report is not None:
+        print_report(aa_report)
+    if lod_report is not None:
+        print_lod_report(lod_report)
+    if cache is not None:
+        print(cache.summary())
+    
+    print(f"✅ Successfully generated {len(icon_configs)} professional app icons in {len(APPEARANCES)} appearances!")
     print(f"📁 Icons saved to: {assets_dir}")
     print("\n🎯 Design features:")
     print("• Gradient background (iOS blue to purple)")
@@ -254,6 +356,7 @@ def main():
     print("• 'K' branding letter")
     print("• Red notification badge for urgency")
     print("• Rounded corners and modern design")
+    print("• Light, dark and tinted appearances")
     print("\n🚀 Next steps:")
     print("1. Open your Xcode project")
     print("2. The icons should appear in Assets.xcassets")
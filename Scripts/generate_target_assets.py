@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Multi-target asset generator for Kansyl
+Builds the asset catalogs of the app, the widget and the share extension
+in one run from Scripts/asset_targets.json
+
+Every distinct (generator, pixel size, appearance) is rendered and encoded
+once, however many sets and targets use it. The first copy is written
+normally and every other copy is hardlinked to it; where hardlinks aren't
+possible (another filesystem, Windows shares) the encoded bytes are copied.
+
+Sets written here are marked as generated in their Contents.json. A set
+that already exists without that mark (hand-made artwork, a set edited in
+Xcode) is never overwritten; the run stops and lists it instead.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+from pathlib import Path
+
+from artifact_cache import cached_pngs, default_cache, write_output
+from icon_appearances import (
+    APPEARANCES, appearance_entries, appearance_filename, compose_appearances, config_appearances
+)
+from resize_app_icon import ICON_CONFIGS, icon_contents_entry, icon_filename
+import generate_calendar_icon
+import generate_icon_simple
+import generate_professional_icon
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_MANIFEST = Path(__file__).with_name("asset_targets.json")
+
+# Contents.json "author" of the sets this script generates and may replace
+GENERATED_AUTHOR = "generate_target_assets"
+
+# Imagesets get light and dark variants; tinted only applies to app icons
+IMAGESET_APPEARANCES = ["light", "dark"]
+
+def render_generator(generator, size, appearances):
+    """Renderer for one size of a procedural icon in several appearances
+
+    Returns (render function, cache sources, cache params); the params match
+    the ones the generator scripts use, so both share artifact cache entries.
+    """
+    if generator == "calendar":
+        module = generate_calendar_icon
+        params = {}
+        layers = lambda: (module.draw_calendar_background(size),
+                          module.draw_calendar_foreground(size))
+    elif generator == "professional":
+        module = generate_professional_icon
+        style = "gradient" if size >= 40 else "minimal"
+        params = {"style": style}
+        layers = lambda: (module.draw_professional_background(size, style),
+                          module.draw_professional_foreground(size))
+    elif generator == "simple":
+        module = generate_icon_simple
+        params = {}
+        layers = lambda: (module.draw_icon_background(size),
+                          module.draw_icon_foreground(size))
+    else:
+        raise ValueError(f"Unknown generator: {generator}")
+
+    def render(names):
+        background, foreground = layers()
+        return compose_appearances(background, foreground, names)
+
+    return render, module.CACHE_SOURCES, dict(generator=generator, size=size, **params)
+
+def plan_appiconset(set_name, spec):
+    """Outputs and Contents.json for a generated .appiconset"""
+    outputs = []
+    contents = {"images": [], "info": {"author": GENERATED_AUTHOR, "version": 1}}
+    for config in ICON_CONFIGS:
+        pixel_size = int(config["size"] * config["scale"])
+        entry = icon_contents_entry(config)
+        for appearance in config_appearances(config):
+            filename = appearance_filename(icon_filename(config), appearance)
+            # iPhone and iPad configs of the same size share one file
+            if all(filename != existing for existing, _ in outputs):
+                outputs.append((filename, (spec["generator"], pixel_size, appearance)))
+        contents["images"].extend(appearance_entries(entry))
+    return f"{set_name}.appiconset", outputs, contents
+
+def plan_imageset(set_name, spec):
+    """Outputs and Contents.json for a generated 1x/2x/3x .imageset"""
+    outputs = []
+    contents = {"images": [], "info": {"author": GENERATED_AUTHOR, "version": 1}}
+    for appearance in IMAGESET_APPEARANCES:
+        for scale in (1, 2, 3):
+            suffix = "" if appearance == "light" else f"-{appearance}"
+            filename = f"{set_name}{suffix}.png" if scale == 1 else f"{set_name}{suffix}@{scale}x.png"
+            outputs.append((filename, (spec["generator"], spec["points"] * scale, appearance)))
+            entry = {"filename": filename, "idiom": "universal", "scale": f"{scale}x"}
+            if appearance != "light":
+                entry["appearances"] = [{"appearance": "luminosity", "value": appearance}]
+            contents["images"].append(entry)
+    return f"{set_name}.imageset", outputs, contents
+
+def load_manifest(path):
+    """Read the target manifest"""
+    with open(path) as f:
+        return json.load(f)
+
+def plan(manifest, base_dir, targets=None):
+    """Resolve the manifest into per-catalog set plans
+
+    Returns a list of (catalog_dir, set_dir_name, outputs, contents, copy_from)
+    where outputs are (filename, render_key) pairs and copy_from is the
+    source set directory for "copy" sets.
+    """
+    plans = []
+    for target_name, target in manifest["targets"].items():
+        if targets and target_name not in targets:
+            continue
+        catalog_dir = base_dir / target["catalog"]
+        for set_name in target["sets"]:
+            spec = manifest["sets"][set_name]
+            if spec["type"] == "appiconset":
+                plans.append((catalog_dir, *plan_appiconset(set_name, spec), None))
+            elif spec["type"] == "imageset":
+                plans.append((catalog_dir, *plan_imageset(set_name, spec), None))
+            elif spec["type"] == "copy":
+                source_catalog = base_dir / spec["from"]
+                for source_set in sorted(source_catalog.glob(spec["pattern"])):
+                    # Copying a catalog onto itself is a no-op
+                    if source_catalog.resolve() != catalog_dir.resolve():
+                        plans.append((catalog_dir, source_set.name, [], None, source_set))
+            else:
+                raise ValueError(f"Unknown set type for {set_name}: {spec['type']}")
+    return plans
+
+class Linker:
+    """Places files, hardlinking repeats of content that's already on disk"""
+
+    def __init__(self):
+        self.first_copy = {}
+        self.stats = {"written": 0, "linked": 0, "copied": 0}
+
+    def place(self, content_key, dest, data=None, source=None):
+        """Put content at dest from bytes (data) or an existing file (source)"""
+        if os.path.lexists(dest):
+            # Never write through an existing (possibly linked) file
+            os.unlink(dest)
+
+        origin = self.first_copy.get(content_key, source)
+        if origin is not None:
+            try:
+                os.link(origin, dest)
+                self.stats["linked"] += 1
+                self.first_copy.setdefault(content_key, dest)
+                return
+            except OSError:
+                pass
+            if data is None:
+                shutil.copyfile(origin, dest)
+                self.stats["copied"] += 1
+                return
+
+        write_output(dest, data)
+        self.stats["written" if content_key not in self.first_copy else "copied"] += 1
+        self.first_copy.setdefault(content_key, dest)
+
+def write_contents(path, contents):
+    """Write a Contents.json file"""
+    with open(path, 'w') as f:
+        json.dump(contents, f, indent=2)
+
+def render_pngs(render_keys, cache=None):
+    """PNG bytes for each (generator, size, appearance), each rendered once
+
+    Keys are grouped by (generator, size) so the layers of a size are drawn
+    once for all of its appearances.
+    """
+    needed = {}
+    for generator, size, appearance in render_keys:
+        needed.setdefault((generator, size), set()).add(appearance)
+
+    pngs = {}
+    for (generator, size), appearances in sorted(needed.items()):
+        render, sources, params = render_generator(generator, size, appearances)
+        names = [a for a in APPEARANCES if a in appearances]
+        for appearance, data in cached_pngs(cache, sources, names, render, **params).items():
+            pngs[(generator, size, appearance)] = data
+    return pngs
+
+def foreign_sets(plans):
+    """Existing set directories in the plans that this script didn't generate"""
+    foreign = []
+    for catalog_dir, set_dir_name, _, _, _ in plans:
+        set_dir = catalog_dir / set_dir_name
+        if not set_dir.exists():
+            continue
+        try:
+            with open(set_dir / "Contents.json") as f:
+                author = json.load(f).get("info", {}).get("author")
+        except (OSError, ValueError):
+            author = None
+        if author != GENERATED_AUTHOR and any(set_dir.iterdir()):
+            foreign.append(set_dir)
+    return foreign
+
+def build(plans, cache=None):
+    """Render every distinct image once and place it in every set that uses it"""
+    pngs = render_pngs((key for _, _, outputs, _, _ in plans for _, key in outputs), cache)
+
+    linker = Linker()
+    for catalog_dir, set_dir_name, outputs, contents, copy_from in plans:
+        if not (catalog_dir / "Contents.json").exists():
+            catalog_dir.mkdir(parents=True, exist_ok=True)
+            write_contents(catalog_dir / "Contents.json", {"info": {"author": "xcode", "version": 1}})
+        set_dir = catalog_dir / set_dir_name
+        set_dir.mkdir(parents=True, exist_ok=True)
+
+        if copy_from is not None:
+            keep = set()
+            for source in sorted(copy_from.iterdir()):
+                if source.is_file():
+                    keep.add(source.name)
+                    if source.name == "Contents.json":
+                        with open(source) as f:
+                            copied = json.load(f)
+                        copied.setdefault("info", {})["author"] = GENERATED_AUTHOR
+                        write_contents(set_dir / source.name, copied)
+                    else:
+                        linker.place(("file", str(source)), set_dir / source.name, source=source)
+        else:
+            keep = {"Contents.json"}
+            for filename, render_key in outputs:
+                keep.add(filename)
+                linker.place(render_key, set_dir / filename, data=pngs[render_key])
+            write_contents(set_dir / "Contents.json", contents)
+
+        # Drop files left over from an earlier layout of this set
+        for stale in set_dir.iterdir():
+            if stale.is_file() and stale.name not in keep:
+                stale.unlink()
+
+    return len(pngs), linker.stats
+
+def main():
+    """Generate the asset sets of every target in the manifest"""
+    parser = argparse.ArgumentParser(description="Generate asset catalogs for all Kansyl targets")
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST), help="Target manifest JSON")
+    parser.add_argument("--target", action="append", default=[],
+                        help="Only build this target (repeatable; default: all)")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    unknown = set(args.target) - set(manifest["targets"])
+    if unknown:
+        print(f"❌ Unknown targets: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    plans = plan(manifest, BASE_DIR, set(args.target))
+    foreign = foreign_sets(plans)
+    if foreign:
+        print("❌ Refusing to replace sets this script didn't generate:")
+        for set_dir in foreign:
+            print(f"   • {set_dir}")
+        print("   Remove them from the manifest, or delete them to have them generated")
+        sys.exit(1)
+    cache = default_cache()
+
+    print(f"🎯 Building {len(plans)} sets for {len(args.target) or len(manifest['targets'])} targets...")
+    rendered, stats = build(plans, cache)
+
+    print(f"✅ Rendered {rendered} distinct images")
+    print(f"   Written: {stats['written']}, hardlinked: {stats['linked']}, copied: {stats['copied']}")
+    if cache is not None:
+        print(f"   {cache.summary()}")
+    for target_name, target in manifest["targets"].items():
+        if not args.target or target_name in args.target:
+            print(f"📁 {target_name}: {BASE_DIR / target['catalog']}")
+
+if __name__ == "__main__":
+    main()
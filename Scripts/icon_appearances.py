@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Appearance variants for Kansyl app icons
+Builds the light, dark and tinted icon appearances from one set of layers
+"""
+
+import os
+
+# Check if Pillow is installed
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image
+
+# Appearances written into every .appiconset, in Contents.json order
+APPEARANCES = ["light", "dark", "tinted"]
+
+# App Store Connect rejects a marketing icon with an alpha channel
+MARKETING_SIZE = 1024
+
+# Dark appearance: the background keeps its hue but drops to a deep tone,
+# the foreground is softened slightly so pure white doesn't glare
+DARK_BACKGROUND_MATRIX = (
+    0.20, 0.02, 0.02, 0,
+    0.02, 0.20, 0.02, 0,
+    0.02, 0.02, 0.22, 6,
+)
+DARK_FOREGROUND_MATRIX = (
+    0.92, 0, 0, 0,
+    0, 0.92, 0, 0,
+    0, 0, 0.92, 0,
+)
+
+def _recolor(layer, matrix):
+    """Apply a 3x4 color matrix to the RGB channels, keeping alpha"""
+    alpha = layer.getchannel('A')
+    recolored = layer.convert('RGB').convert('RGB', matrix)
+    recolored.putalpha(alpha)
+    return recolored
+
+def _luminance(layer):
+    """Convert the RGB channels to grayscale luminance, keeping alpha"""
+    alpha = layer.getchannel('A')
+    gray = layer.convert('RGB').convert('L')
+    return Image.merge('RGBA', (gray, gray, gray, alpha))
+
+def _blackout(layer):
+    """Replace the RGB channels with black, keeping alpha"""
+    black = Image.new('L', layer.size, 0)
+    return Image.merge('RGBA', (black, black, black, layer.getchannel('A')))
+
+def _flatten(img):
+    """Composite an RGBA icon onto white and drop the alpha channel"""
+    background = Image.new('RGB', img.size, (255, 255, 255))
+    background.paste(img, (0, 0), img)
+    return background
+
+def compose_appearances(background, foreground, appearances=APPEARANCES):
+    """Composite the shared layers once per appearance
+
+    Both layers must be RGBA images of the same size. The geometry is drawn
+    once by the caller; each appearance only recolors the finished layers.
+    The light marketing-size icon is flattened to RGB like
+    resize_app_icon.prepare_icon does.
+    """
+    variants = {}
+    for appearance in appearances:
+        if appearance == "light":
+            bg, fg = background, foreground
+        elif appearance == "dark":
+            bg = _recolor(background, DARK_BACKGROUND_MATRIX)
+            fg = _recolor(foreground, DARK_FOREGROUND_MATRIX)
+        elif appearance == "tinted":
+            # The system tints from luminance, so the icon is grayscale on black
+            bg = _blackout(background)
+            fg = _luminance(foreground)
+        else:
+            raise ValueError(f"Unknown appearance: {appearance}")
+        variant = Image.alpha_composite(bg, fg)
+        if appearance == "light" and variant.width == MARKETING_SIZE:
+            variant = _flatten(variant)
+        variants[appearance] = variant
+    return variants
+
+def appearance_filename(filename, appearance):
+    """Filename for an appearance variant (light keeps the original name)"""
+    if appearance == "light":
+        return filename
+    return filename.replace("icon-", f"icon-{appearance}-", 1)
+
+def config_appearances(config):
+    """Appearances to render for one icon config
+
+    Xcode only reads luminosity appearances on universal iOS entries, so
+    dark and tinted are rendered once, at the 1024pt marketing size; every
+    other size is light only.
+    """
+    if config["idiom"] == "ios-marketing":
+        return APPEARANCES
+    return ["light"]
+
+def appearance_entries(entry):
+    """Contents.json entries for a light legacy entry and its variants
+
+    Legacy iphone/ipad/ios-marketing entries stay light only. The marketing
+    entry is followed by a universal iOS 1024x1024 entry per appearance,
+    which is where Xcode picks up the dark and tinted icons.
+    """
+    entries = [entry]
+    if entry["idiom"] == "ios-marketing":
+        for appearance in APPEARANCES:
+            variant = {
+                "filename": appearance_filename(entry["filename"], appearance),
+                "idiom": "universal",
+                "platform": "ios",
+                "size": "1024x1024",
+            }
+            if appearance != "light":
+                variant["appearances"] = [
+                    {"appearance": "luminosity", "value": appearance}
+                ]
+            entries.append(variant)
+    return entries
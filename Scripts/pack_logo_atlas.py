@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Sprite atlas packer for the Kansyl brand logos
+Packs every *-logo.imageset into one atlas PNG per scale (1x/2x/3x) plus a
+compact index of each brand's rectangle, so list views can load one
+texture per scale instead of dozens of separate files
+
+Output (by default into the asset catalog):
+    logo-atlas.imageset/   logo-atlas.png, logo-atlas@2x.png, logo-atlas@3x.png
+    logo-atlas.dataset/    logo-atlas.json (or .plist) with the rectangles
+
+Reruns are incremental: if only some logos changed and their sizes didn't,
+they are redrawn in place in the existing atlases; nothing is repacked.
+"""
+
+import os
+import sys
+import json
+import math
+import hashlib
+import argparse
+import plistlib
+from pathlib import Path
+
+# Check if Pillow is installed
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_CATALOG = BASE_DIR / "kansyl" / "Assets.xcassets"
+DEFAULT_STATE = BASE_DIR / ".asset_cache" / "logo_atlas_state.json"
+
+ATLAS_NAME = "logo-atlas"
+SCALES = ["1x", "2x", "3x"]
+
+# Bump when the index or state format changes
+ATLAS_VERSION = 1
+
+def read_logos(catalog_dir):
+    """Find every brand logo and its file for each scale
+
+    Returns {brand: {scale: {"path", "sha256", "size"}}}.
+    """
+    logos = {}
+    for set_dir in sorted(catalog_dir.glob("*-logo.imageset")):
+        brand = set_dir.name[:-len("-logo.imageset")]
+        with open(set_dir / "Contents.json") as f:
+            contents = json.load(f)
+
+        files = {}
+        for image in contents.get("images", []):
+            filename = image.get("filename")
+            scale = image.get("scale", "1x")
+            if not filename or scale not in SCALES:
+                continue
+            path = set_dir / filename
+            data = path.read_bytes()
+            with Image.open(path) as img:
+                size = img.size
+            files[scale] = {
+                "path": str(path),
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "size": list(size),
+            }
+        if files:
+            logos[brand] = files
+    return logos
+
+def pack_shelves(sizes, padding):
+    """Shelf-pack rectangles into a roughly square atlas
+
+    sizes maps a name to (width, height). Rectangles are placed tallest
+    first, left to right, starting a new shelf when a row is full.
+    Returns ((atlas_width, atlas_height), {name: [x, y, w, h]}).
+    """
+    if not sizes:
+        return (1, 1), {}
+    area = sum((w + padding) * (h + padding) for w, h in sizes.values())
+    widest = max(w for w, _ in sizes.values())
+    atlas_width = max(widest + padding, math.ceil(math.sqrt(area)))
+
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+    rects = {}
+    x = y = shelf_height = 0
+    for name in order:
+        w, h = sizes[name]
+        if x + w > atlas_width and x > 0:
+            y += shelf_height + padding
+            x = shelf_height = 0
+        rects[name] = [x, y, w, h]
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+
+    atlas_height = y + shelf_height
+    atlas_width = max(r[0] + r[2] for r in rects.values())
+    return (atlas_width, atlas_height), rects
+
+def render_atlas(logos, scale, atlas_size, rects):
+    """Compose one atlas image from the packed rectangles"""
+    atlas = Image.new('RGBA', atlas_size, (0, 0, 0, 0))
+    for brand, rect in rects.items():
+        with Image.open(logos[brand][scale]["path"]) as img:
+            atlas.paste(img.convert('RGBA'), (rect[0], rect[1]))
+    return atlas
+
+def load_state(state_path, output_dir):
+    """Previous run's layout and logo hashes, if compatible
+
+    The state describes the atlases of one output directory; a run into a
+    different directory can't reuse it.
+    """
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get("version") == ATLAS_VERSION and state.get("output") == str(output_dir.resolve()):
+            return state
+    except (OSError, ValueError):
+        pass
+    return None
+
+def write_catalog_sets(output_dir, index, index_format):
+    """Write the index dataset and the imageset Contents.json"""
+    imageset = output_dir / f"{ATLAS_NAME}.imageset"
+    with open(imageset / "Contents.json", 'w') as f:
+        json.dump({
+            "images": [
+                {"filename": index["scales"][scale]["file"], "idiom": "universal", "scale": scale}
+                for scale in SCALES if scale in index["scales"]
+            ],
+            "info": {"author": "xcode", "version": 1},
+        }, f, indent=2)
+
+    dataset = output_dir / f"{ATLAS_NAME}.dataset"
+    dataset.mkdir(parents=True, exist_ok=True)
+    for stale in dataset.glob(f"{ATLAS_NAME}.*"):
+        stale.unlink()
+    if index_format == "plist":
+        index_name = f"{ATLAS_NAME}.plist"
+        with open(dataset / index_name, 'wb') as f:
+            plistlib.dump(index, f, fmt=plistlib.FMT_BINARY)
+        type_identifier = "com.apple.property-list"
+    else:
+        index_name = f"{ATLAS_NAME}.json"
+        with open(dataset / index_name, 'w') as f:
+            json.dump(index, f, separators=(",", ":"))
+        type_identifier = "public.json"
+
+    with open(dataset / "Contents.json", 'w') as f:
+        json.dump({
+            "data": [{"filename": index_name, "idiom": "universal",
+                      "universal-type-identifier": type_identifier}],
+            "info": {"author": "xcode", "version": 1},
+        }, f, indent=2)
+
+def atlas_filename(scale):
+    """Filename of the atlas image for a scale"""
+    return f"{ATLAS_NAME}.png" if scale == "1x" else f"{ATLAS_NAME}@{scale}.png"
+
+def build(catalog_dir, output_dir, state_path, padding=1, index_format="json", force=False):
+    """Pack or incrementally update the atlases; returns a summary dict"""
+    logos = read_logos(catalog_dir)
+    state = None if force else load_state(state_path, output_dir)
+    imageset = output_dir / f"{ATLAS_NAME}.imageset"
+    imageset.mkdir(parents=True, exist_ok=True)
+
+    index = {"version": ATLAS_VERSION, "scales": {}}
+    summary = {"brands": len(logos), "repacked": [], "updated": {}, "unchanged": []}
+
+    for scale in SCALES:
+        scale_factor = int(scale[0])
+        present = {brand: files[scale] for brand, files in logos.items() if scale in files}
+        if not present:
+            continue
+        filename = atlas_filename(scale)
+        atlas_path = imageset / filename
+
+        previous = (state or {}).get("scales", {}).get(scale)
+        changed = []
+        reusable = (
+            previous is not None
+            and atlas_path.exists()
+            and set(previous["logos"]) == set(present)
+            and previous["padding"] == padding
+        )
+        if reusable:
+            for brand, info in present.items():
+                old = previous["logos"][brand]
+                if old["sha256"] != info["sha256"]:
+                    if old["size"] != info["size"]:
+                        reusable = False
+                        break
+                    changed.append(brand)
+
+        if reusable:
+            atlas_size = tuple(previous["atlas_size"])
+            rects = previous["rects"]
+            if changed:
+                # Redraw only the changed logos in their existing slots
+                with Image.open(atlas_path) as old_atlas:
+                    atlas = old_atlas.convert('RGBA')
+                for brand in changed:
+                    x, y, w, h = rects[brand]
+                    atlas.paste((0, 0, 0, 0), (x, y, x + w, y + h))
+                    with Image.open(present[brand]["path"]) as img:
+                        atlas.paste(img.convert('RGBA'), (x, y))
+                atlas.save(atlas_path, 'PNG', optimize=True)
+                summary["updated"][scale] = sorted(changed)
+            else:
+                summary["unchanged"].append(scale)
+        else:
+            sizes = {brand: tuple(info["size"]) for brand, info in present.items()}
+            atlas_size, rects = pack_shelves(sizes, padding * scale_factor)
+            render_atlas(logos, scale, atlas_size, rects).save(atlas_path, 'PNG', optimize=True)
+            summary["repacked"].append(scale)
+
+        index["scales"][scale] = {
+            "file": filename,
+            "size": list(atlas_size),
+            "rects": {brand: rects[brand] for brand in sorted(rects)},
+        }
+        state = state or {"version": ATLAS_VERSION, "output": str(output_dir.resolve()), "scales": {}}
+        state["scales"][scale] = {
+            "padding": padding,
+            "atlas_size": list(atlas_size),
+            "rects": rects,
+            "logos": {brand: {"sha256": info["sha256"], "size": info["size"]}
+                      for brand, info in present.items()},
+        }
+
+    write_catalog_sets(output_dir, index, index_format)
+    if state is not None:
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w') as f:
+            json.dump(state, f)
+    summary["index"] = index
+    return summary
+
+def main():
+    """Pack the brand logos into per-scale atlases"""
+    parser = argparse.ArgumentParser(description="Pack brand logo imagesets into sprite atlases")
+    parser.add_argument("--catalog", default=str(DEFAULT_CATALOG),
+                        help="Asset catalog containing the *-logo.imagesets")
+    parser.add_argument("--output", default=None,
+                        help="Directory for logo-atlas.imageset/.dataset (default: the catalog)")
+    parser.add_argument("--padding", type=int, default=1,
+                        help="Gap between logos in points, to avoid filtering bleed (default: 1)")
+    parser.add_argument("--format", choices=["json", "plist"], default="json",
+                        help="Index format (default: json)")
+    parser.add_argument("--state", default=str(DEFAULT_STATE),
+                        help="Incremental state file from the previous run")
+    parser.add_argument("--force", action="store_true", help="Repack everything")
+    args = parser.parse_args()
+
+    catalog_dir = Path(args.catalog)
+    if not catalog_dir.is_dir():
+        print(f"❌ Asset catalog not found: {catalog_dir}")
+        sys.exit(1)
+    output_dir = Path(args.output) if args.output else catalog_dir
+
+    summary = build(catalog_dir, output_dir, Path(args.state), args.padding, args.format, args.force)
+
+    print(f"🧩 Packed {summary['brands']} brand logos into {output_dir / (ATLAS_NAME + '.imageset')}")
+    for scale, info in summary["index"]["scales"].items():
+        width, height = info["size"]
+        if scale in summary["repacked"]:
+            status = "repacked"
+        elif scale in summary["updated"]:
+            status = f"updated {', '.join(summary['updated'][scale])}"
+        else:
+            status = "unchanged"
+        print(f"   {scale}: {info['file']} {width}x{height} ({status})")
+
+if __name__ == "__main__":
+    main()
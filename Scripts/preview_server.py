@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Local preview render server for Kansyl icons
+Keeps Python, Pillow, fonts, rendered layers and decoded source images warm
+between requests, so a designer can see an icon change without paying for
+a cold start and a full regeneration
+
+    python3 Scripts/preview_server.py                      # http://127.0.0.1:8766
+    python3 Scripts/preview_server.py --unix /tmp/kansyl-preview.sock
+
+Endpoints:
+    GET /                  grid of every app icon size in every appearance
+    GET /render?generator=calendar&size=180&appearance=dark
+    GET /render?source=path/to/icon.png&size=120&color_space=display-p3
+    GET /stats             request latency histogram and cache counters (JSON)
+
+Responses carry X-Render-Cache (hit or miss) and a Server-Timing header.
+Edits to the generator scripts are picked up on the next request: the
+changed modules are reloaded and the in-memory cache is cleared.
+"""
+
+import os
+import json
+import time
+import html
+import argparse
+import importlib
+import threading
+import socketserver
+from pathlib import Path
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlencode, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Check if Pillow is installed
+try:
+    from PIL import ImageFont
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import ImageFont
+
+from artifact_cache import encode_png
+from safe_decode import DecodeRejected, SandboxedDecoder
+from icon_appearances import APPEARANCES
+import antialias
+import icon_appearances
+import generate_calendar_icon
+import generate_icon_simple
+import generate_professional_icon
+import color_management
+import resampling
+import resize_app_icon
+import generate_target_assets
+
+GENERATORS = ["calendar", "professional", "simple"]
+MAX_SIZE = 2048
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Reloaded in this order when any of their files change, so each module
+# re-imports the fresh names of the ones before it
+RENDER_MODULES = [
+    antialias,
+    icon_appearances,
+    generate_calendar_icon,
+    generate_professional_icon,
+    generate_icon_simple,
+    color_management,
+    resampling,
+    resize_app_icon,
+    generate_target_assets,
+]
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000]
+
+def _warm_fonts():
+    """Memoize ImageFont.truetype for the life of the server
+
+    The generators look fonts up by path on every render and fall back
+    through several missing paths on Linux; both the fonts and the misses
+    are remembered.
+    """
+    truetype = ImageFont.truetype
+    fonts = {}
+
+    def cached_truetype(font=None, size=10, index=0, encoding="", *args, **kwargs):
+        if not isinstance(font, (str, Path)) or args or kwargs:
+            return truetype(font, size, index, encoding, *args, **kwargs)
+        key = (str(font), size, index, encoding)
+        if key not in fonts:
+            try:
+                fonts[key] = truetype(font, size, index, encoding)
+            except OSError as e:
+                fonts[key] = e
+        result = fonts[key]
+        if isinstance(result, OSError):
+            raise result
+        return result
+
+    ImageFont.truetype = cached_truetype
+
+class LatencyHistogram:
+    """Request latencies per endpoint, in fixed millisecond buckets"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, ms):
+        with self.lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "buckets": [0] * (len(self.buckets) + 1),
+            })
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            index = next((i for i, bound in enumerate(self.buckets) if ms <= bound), len(self.buckets))
+            entry["buckets"][index] += 1
+
+    def snapshot(self):
+        """JSON-ready histogram, one count per bucket"""
+        labels = [f"<={bound}ms" for bound in self.buckets] + [f">{self.buckets[-1]}ms"]
+        with self.lock:
+            return {
+                endpoint: {
+                    "count": entry["count"],
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 2),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "buckets": dict(zip(labels, entry["buckets"])),
+                }
+                for endpoint, entry in self.endpoints.items()
+            }
+
+class PreviewRenderer:
+    """Renders previews and keeps the encoded results in a bounded LRU"""
+
+    def __init__(self, max_cache_bytes=DEFAULT_MAX_CACHE_BYTES):
+        self.max_cache_bytes = max_cache_bytes
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        # Pillow's font and drawing objects aren't meant to be shared
+        # between threads mid-render; renders are short, so take turns
+        self.lock = threading.Lock()
+        # Source images come from request URLs; decode them out of process
+        self.decoder = SandboxedDecoder(1)
+        self.mtimes = self._source_mtimes()
+
+    def _source_mtimes(self):
+        return {module.__name__: os.stat(module.__file__).st_mtime_ns for module in RENDER_MODULES}
+
+    def _reload_if_changed(self):
+        """Reload every renderer module if any of their files changed"""
+        mtimes = self._source_mtimes()
+        if mtimes == self.mtimes:
+            return
+        changed = sorted(name for name, mtime in mtimes.items() if self.mtimes.get(name) != mtime)
+        for module in RENDER_MODULES:
+            importlib.reload(module)
+        self.mtimes = mtimes
+        self.cache.clear()
+        self.cache_bytes = 0
+        self.reloads += 1
+        print(f"🔄 Reloaded renderer modules ({', '.join(changed)})")
+
+    def _key(self, params):
+        """Cache key for a request; source images are keyed by their version"""
+        if "source" in params:
+            stat = os.stat(params["source"])
+            return tuple(sorted(params.items())) + (stat.st_mtime_ns, stat.st_size)
+        return tuple(sorted(params.items()))
+
+    def _render(self, params):
+        size = params["size"]
+        if "source" in params:
+            # load_master keeps the decoded, color-converted source warm
+            data, _ = resize_app_icon.resized_icon_png(params["source"], size, None, params["color_space"],
+                                                      self.decoder)
+            return data
+        render, _, _ = generate_target_assets.render_generator(params["generator"], size, [params["appearance"]])
+        return encode_png(render([params["appearance"]])[params["appearance"]])
+
+    def get(self, params):
+        """PNG bytes for a request and whether they came from the cache"""
+        with self.lock:
+            self._reload_if_changed()
+            key = self._key(params)
+            data = self.cache.get(key)
+            if data is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return data, True
+
+            data = self._render(params)
+            self.misses += 1
+            self.cache[key] = data
+            self.cache_bytes += len(data)
+            while self.cache_bytes > self.max_cache_bytes and len(self.cache) > 1:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= len(evicted)
+            return data, False
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self.cache),
+                "bytes": self.cache_bytes,
+                "reloads": self.reloads,
+            }
+
+def parse_render_params(query):
+    """Validate /render query parameters; raises ValueError with a message"""
+    values = {name: items[-1] for name, items in parse_qs(query).items()}
+    try:
+        size = int(values.get("size", "1024"))
+    except ValueError:
+        raise ValueError("size must be an integer")
+    if not 1 <= size <= MAX_SIZE:
+        raise ValueError(f"size must be between 1 and {MAX_SIZE}")
+
+    if "source" in values:
+        source = values["source"]
+        if not Path(source).is_file():
+            raise ValueError(f"source not found: {source}")
+        color_space = values.get("color_space", "srgb")
+        if color_space not in ("srgb", "display-p3"):
+            raise ValueError("color_space must be srgb or display-p3")
+        return {"source": str(Path(source).resolve()), "size": size, "color_space": color_space}
+
+    generator = values.get("generator", "calendar")
+    appearance = values.get("appearance", "light")
+    if generator not in GENERATORS:
+        raise ValueError(f"generator must be one of {', '.join(GENERATORS)}")
+    if appearance not in APPEARANCES:
+        raise ValueError(f"appearance must be one of {', '.join(APPEARANCES)}")
+    return {"generator": generator, "size": size, "appearance": appearance}
+
+def index_page(query):
+    """HTML grid of every app icon size in every appearance"""
+    values = {name: items[-1] for name, items in parse_qs(query).items()}
+    generator = values.get("generator", "calendar")
+    sizes = sorted({int(c["size"] * c["scale"]) for c in resize_app_icon.ICON_CONFIGS})
+    rows = []
+    for appearance in APPEARANCES:
+        cells = "".join(
+            f'<figure><img src="/render?{html.escape(urlencode({"generator": generator, "size": size, "appearance": appearance}))}"'
+            f' width="{min(size, 256)}"><figcaption>{size}px</figcaption></figure>'
+            for size in sizes
+        )
+        rows.append(f"<h2>{appearance}</h2><div>{cells}</div>")
+    links = " · ".join(f'<a href="/?generator={g}">{g}</a>' for g in GENERATORS)
+    return (
+        "<!doctype html><title>Kansyl icon preview</title>"
+        "<style>body{font:14px -apple-system,sans-serif;margin:24px}"
+        "div{display:flex;flex-wrap:wrap;align-items:flex-end;gap:12px}"
+        "figure{margin:0;text-align:center}figcaption{color:#888}</style>"
+        f"<p>{links}</p>{''.join(rows)}"
+    ).encode()
+
+def make_handler(renderer, histogram):
+    """HTTP handler serving renders, the preview grid and stats"""
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def _send(self, status, content_type, body, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            start = time.perf_counter()
+            url = urlparse(self.path)
+            endpoint = url.path if url.path in ("/", "/render", "/stats") else "other"
+
+            if url.path == "/render":
+                try:
+                    params = parse_render_params(url.query)
+                    data, hit = renderer.get(params)
+                except ValueError as e:
+                    self._send(400, "text/plain; charset=utf-8", f"{e}\n".encode())
+                except DecodeRejected as e:
+                    self._send(422, "text/plain; charset=utf-8", f"Source rejected: {e.reason}\n".encode())
+                except Exception as e:
+                    self._send(500, "text/plain; charset=utf-8", f"Render failed: {e}\n".encode())
+                else:
+                    ms = (time.perf_counter() - start) * 1000
+                    self._send(200, "image/png", data, {
+                        "X-Render-Cache": "hit" if hit else "miss",
+                        "Server-Timing": f"render;dur={ms:.1f}",
+                    })
+            elif url.path == "/stats":
+                body = json.dumps({
+                    "latency": histogram.snapshot(),
+                    "cache": renderer.stats(),
+                }, indent=2).encode()
+                self._send(200, "application/json", body)
+            elif url.path == "/":
+                self._send(200, "text/html; charset=utf-8", index_page(url.query))
+            else:
+                self._send(404, "text/plain; charset=utf-8", b"Not found\n")
+
+            histogram.record(endpoint, (time.perf_counter() - start) * 1000)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PreviewHandler
+
+class UnixPreviewServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket"""
+    daemon_threads = True
+
+    def get_request(self):
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+def main():
+    """Serve icon previews until interrupted"""
+    parser = argparse.ArgumentParser(description="Local Kansyl icon preview render server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-cache-mb", type=int, default=DEFAULT_MAX_CACHE_BYTES // (1024 * 1024),
+                        help="Memory for rendered previews (default: 64)")
+    args = parser.parse_args()
+
+    _warm_fonts()
+    renderer = PreviewRenderer(args.max_cache_mb * 1024 * 1024)
+    histogram = LatencyHistogram()
+    handler = make_handler(renderer, histogram)
+
+    # Render once so the first real request doesn't pay for lazy imports
+    renderer.get({"generator": "calendar", "size": 60, "appearance": "light"})
+
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        server = UnixPreviewServer(args.unix, handler)
+        print(f"🖼  Serving icon previews on unix:{args.unix}")
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        print(f"🖼  Serving icon previews on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+        renderer.decoder.close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+In-memory render API for Kansyl icons
+Renders icons to PNG bytes or raw pixel buffers without touching the
+filesystem, and streams complete .appiconset / .imageset bundles straight
+into a zip or tar archive
+
+    from render_api import render_png, appiconset_files, export_archive
+
+    png = render_png("calendar", 180, "dark")
+    with open("AppIcon.zip", "wb") as f:
+        export_archive(appiconset_files("AppIcon", generator="calendar"), f)
+
+Or from the command line (use -o - to write the archive to stdout):
+
+    python3 Scripts/render_api.py --generator calendar -o AppIcon.zip
+    python3 Scripts/render_api.py --source icon.png --format tar.gz -o - | ...
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import tarfile
+import zipfile
+import argparse
+import contextlib
+
+from artifact_cache import default_cache
+from safe_decode import DecodeRejected
+
+# The generator scripts announce Pillow on import; keep that off stdout,
+# which may be carrying an archive
+with contextlib.redirect_stdout(sys.stderr):
+    from generate_target_assets import plan_appiconset, plan_imageset, render_generator, render_pngs
+    from resize_app_icon import ICON_CONFIGS, icon_contents_entry, icon_filename, resized_icon_png
+
+ARCHIVE_FORMATS = ["zip", "tar", "tar.gz"]
+
+def render_image(generator, size, appearance="light"):
+    """Render one icon as a Pillow image"""
+    render, _, _ = render_generator(generator, size, [appearance])
+    return render([appearance])[appearance]
+
+def render_png(generator, size, appearance="light", cache=None):
+    """Render one icon as encoded PNG bytes"""
+    return render_pngs([(generator, size, appearance)], cache)[(generator, size, appearance)]
+
+def render_pixels(generator, size, appearance="light"):
+    """Render one icon as a read-only memoryview of its raw RGBA pixels
+
+    Rows are size * 4 bytes, top to bottom, at every size (the flattened
+    1024 marketing icon gets an opaque alpha channel back). The buffer can
+    be handed to NumPy (numpy.frombuffer) or written to a pipe without
+    another copy.
+    """
+    img = render_image(generator, size, appearance)
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    return memoryview(img.tobytes())
+
+def _contents_bytes(contents):
+    return json.dumps(contents, indent=2).encode()
+
+def appiconset_files(name, generator=None, source=None, cache=None, color_space="srgb"):
+    """Yield (path, bytes) for every file of an .appiconset bundle
+
+    Renders a procedural generator in every appearance, or resizes a source
+    image (light only; decoded in a sandbox, so DecodeRejected can be
+    raised). Paths are relative, e.g. "AppIcon.appiconset/...".
+    """
+    if (generator is None) == (source is None):
+        raise ValueError("Pass exactly one of generator or source")
+
+    if generator is not None:
+        set_dir, outputs, contents = plan_appiconset(name, {"generator": generator})
+        pngs = render_pngs([key for _, key in outputs], cache)
+        for filename, key in outputs:
+            yield f"{set_dir}/{filename}", pngs[key]
+    else:
+        set_dir = f"{name}.appiconset"
+        contents = {"images": [], "info": {"author": "xcode", "version": 1}}
+        written = set()
+        for config in ICON_CONFIGS:
+            filename = icon_filename(config)
+            contents["images"].append(icon_contents_entry(config))
+            if filename not in written:
+                written.add(filename)
+                size = int(config["size"] * config["scale"])
+                data, _ = resized_icon_png(source, size, cache, color_space)
+                yield f"{set_dir}/{filename}", data
+    yield f"{set_dir}/Contents.json", _contents_bytes(contents)
+
+def imageset_files(name, generator, points, cache=None):
+    """Yield (path, bytes) for every file of a 1x/2x/3x .imageset bundle"""
+    set_dir, outputs, contents = plan_imageset(name, {"generator": generator, "points": points})
+    pngs = render_pngs([key for _, key in outputs], cache)
+    for filename, key in outputs:
+        yield f"{set_dir}/{filename}", pngs[key]
+    yield f"{set_dir}/Contents.json", _contents_bytes(contents)
+
+def export_archive(files, fileobj, archive_format="zip"):
+    """Stream (path, bytes) pairs into a zip or tar archive
+
+    fileobj only needs write(), so it can be a pipe, socket or HTTP
+    response; nothing is staged on disk. PNGs are stored uncompressed in
+    zips since they are already deflated. Returns the number of files.
+    """
+    count = 0
+    mtime = time.time()
+    if archive_format == "zip":
+        with zipfile.ZipFile(fileobj, 'w') as archive:
+            for path, data in files:
+                info = zipfile.ZipInfo(path, time.localtime(mtime)[:6])
+                info.compress_type = zipfile.ZIP_STORED if path.endswith(".png") else zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                archive.writestr(info, data)
+                count += 1
+    elif archive_format in ("tar", "tar.gz"):
+        mode = "w|gz" if archive_format == "tar.gz" else "w|"
+        with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+            for path, data in files:
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                info.mtime = mtime
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(data))
+                count += 1
+    else:
+        raise ValueError(f"Unknown archive format: {archive_format} (expected one of {ARCHIVE_FORMATS})")
+    return count
+
+def main():
+    """Export an icon bundle as a zip or tar archive"""
+    parser = argparse.ArgumentParser(description="Render an icon bundle straight into an archive")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--generator", choices=["calendar", "professional", "simple"],
+                       help="Procedural icon to render")
+    group.add_argument("--source", help="Source image to resize into an app icon set")
+    parser.add_argument("--name", default="AppIcon", help="Set name (default: AppIcon)")
+    parser.add_argument("--imageset-points", type=int, default=None,
+                        help="Export a 1x/2x/3x imageset of this point size instead of an app icon set")
+    parser.add_argument("--color-space", choices=["srgb", "display-p3"], default="srgb",
+                        help="Working color space for --source (default: srgb)")
+    parser.add_argument("--format", choices=ARCHIVE_FORMATS, default="zip", help="Archive format (default: zip)")
+    parser.add_argument("-o", "--output", required=True, help="Archive path, or - for stdout")
+    args = parser.parse_args()
+
+    if args.imageset_points is not None:
+        if args.generator is None:
+            parser.error("--imageset-points needs --generator")
+        files = imageset_files(args.name, args.generator, args.imageset_points, default_cache())
+    else:
+        files = appiconset_files(args.name, args.generator, args.source, default_cache(), args.color_space)
+
+    try:
+        if args.output == "-":
+            count = export_archive(files, sys.stdout.buffer, args.format)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, 'wb') as f:
+                count = export_archive(files, f, args.format)
+    except DecodeRejected as e:
+        if args.output != "-":
+            os.unlink(args.output)
+        print(f"❌ Rejected {e.label}: {e.reason}", file=sys.stderr)
+        sys.exit(1)
+    # Keep stdout clean for the archive itself
+    print(f"📦 Exported {count} files to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Pluggable resampling backends for Kansyl asset resizing
+Every downscale in the asset scripts goes through resize(); the backend is
+picked at runtime:
+
+    pillow           Image.resize with LANCZOS (the default)
+    numpy            separable Lanczos-3 as two matrix products, with the
+                     filter matrices cached per (source, target) size pair
+    numpy-threaded   the same, with output rows split across threads
+    auto             the fastest backend from the last saved benchmark
+
+Select one with KANSYL_RESAMPLER=<name> or set_backend(). NumPy is
+optional; without it the NumPy backends are unavailable.
+
+Compare them on the real icon and logo sizes and remember the winner:
+
+    python3 Scripts/resampling.py --save
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Check if Pillow is installed
+try:
+    from PIL import Image
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image
+
+# NumPy is optional; only the NumPy backends need it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_RESULTS = BASE_DIR / ".asset_cache" / "resampler.json"
+DEFAULT_SOURCE = BASE_DIR / "kansyl" / "Assets.xcassets" / "AppIcon.appiconset" / "icon-1024x1024@1x.png"
+
+# Lanczos window radius in source pixels (at 1:1), as in Pillow
+LANCZOS_SUPPORT = 3.0
+
+class PillowBackend:
+    """Pillow's own Lanczos resampling"""
+    name = "pillow"
+
+    def resize(self, img, size):
+        return img.resize(size, Image.Resampling.LANCZOS)
+
+def _lanczos(x):
+    """Lanczos-3 kernel"""
+    x = np.abs(x)
+    out = np.sinc(x) * np.sinc(x / LANCZOS_SUPPORT)
+    out[x >= LANCZOS_SUPPORT] = 0.0
+    return out
+
+_weights = {}
+_weights_lock = threading.Lock()
+
+def filter_matrix(src, dst):
+    """(dst, src) float32 matrix resampling a line of src pixels to dst
+
+    Follows Pillow's convention: pixel centers at i + 0.5 and, when
+    downscaling, the kernel stretched by the scale factor. Cached per
+    (src, dst) pair for the life of the process.
+    """
+    key = (src, dst)
+    with _weights_lock:
+        matrix = _weights.get(key)
+    if matrix is not None:
+        return matrix
+
+    scale = src / dst
+    filterscale = max(scale, 1.0)
+    support = LANCZOS_SUPPORT * filterscale
+    centers = (np.arange(dst) + 0.5) * scale
+    matrix = np.zeros((dst, src), dtype=np.float64)
+    for i, center in enumerate(centers):
+        lo = max(0, int(math.floor(center - support)))
+        hi = min(src, int(math.ceil(center + support)))
+        taps = _lanczos((np.arange(lo, hi) + 0.5 - center) / filterscale)
+        total = taps.sum()
+        if total != 0:
+            taps /= total
+        matrix[i, lo:hi] = taps
+    matrix = matrix.astype(np.float32)
+
+    with _weights_lock:
+        return _weights.setdefault(key, matrix)
+
+def _to_array(img):
+    """Float32 (channels, height, width) array, premultiplied if it has alpha"""
+    if img.mode not in ('RGB', 'RGBA', 'L'):
+        img = img.convert('RGBA')
+    mode = img.mode
+    if mode == 'RGBA':
+        # Resample in premultiplied alpha like Pillow, so transparent
+        # pixels don't bleed their color into the edges
+        img = img.convert('RGBa')
+    arr = np.asarray(img)
+    if arr.ndim == 2:
+        arr = arr[:, :, None]
+    return np.ascontiguousarray(arr.transpose(2, 0, 1)).astype(np.float32), mode
+
+def _from_array(arr, mode, info):
+    out = np.clip(np.rint(arr), 0, 255).astype(np.uint8).transpose(1, 2, 0)
+    if mode == 'L':
+        img = Image.fromarray(np.ascontiguousarray(out[:, :, 0]), 'L')
+    elif mode == 'RGBA':
+        img = Image.frombytes('RGBa', (out.shape[1], out.shape[0]), out.tobytes()).convert('RGBA')
+    else:
+        img = Image.fromarray(np.ascontiguousarray(out), mode)
+    img.info.update(info)
+    return img
+
+class NumpyBackend:
+    """Separable Lanczos-3 as two matrix products per channel"""
+    name = "numpy"
+
+    def _resample(self, arr, rows_matrix, cols_matrix):
+        # Apply the more reducing pass first to keep the middle array small
+        _, height, width = arr.shape
+        if rows_matrix.shape[0] * width <= height * cols_matrix.shape[0]:
+            return np.matmul(np.matmul(rows_matrix, arr), cols_matrix.T)
+        return np.matmul(rows_matrix, np.matmul(arr, cols_matrix.T))
+
+    def resize(self, img, size):
+        width, height = size
+        if img.size == size:
+            return img.copy()
+        arr, mode = _to_array(img)
+        rows_matrix = filter_matrix(img.height, height)
+        cols_matrix = filter_matrix(img.width, width)
+        return _from_array(self._resample(arr, rows_matrix, cols_matrix), mode, img.info)
+
+class ThreadedNumpyBackend(NumpyBackend):
+    """NumPy resampling with the output rows split into chunks across threads
+
+    NumPy releases the GIL inside matrix products, so chunks run in
+    parallel; each chunk only uses the source rows its filter taps touch.
+    """
+    name = "numpy-threaded"
+
+    def __init__(self, workers=None, min_rows=64):
+        self.workers = workers or os.cpu_count() or 2
+        self.min_rows = min_rows
+        self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="resample")
+
+    def _resample(self, arr, rows_matrix, cols_matrix):
+        height = rows_matrix.shape[0]
+        chunks = min(self.workers, max(1, height // self.min_rows))
+        if chunks == 1:
+            return super()._resample(arr, rows_matrix, cols_matrix)
+
+        bounds = np.linspace(0, height, chunks + 1).astype(int)
+
+        def chunk(lo, hi):
+            taps = np.nonzero(rows_matrix[lo:hi].any(axis=0))[0]
+            first, last = taps[0], taps[-1] + 1
+            return super(ThreadedNumpyBackend, self)._resample(
+                arr[:, first:last], rows_matrix[lo:hi, first:last], cols_matrix)
+
+        parts = self.pool.map(lambda b: chunk(*b), zip(bounds[:-1], bounds[1:]))
+        return np.concatenate(list(parts), axis=1)
+
+BACKENDS = {
+    "pillow": PillowBackend,
+    "numpy": NumpyBackend,
+    "numpy-threaded": ThreadedNumpyBackend,
+}
+
+_backend = None
+
+def available_backends():
+    """Names of the backends usable in this environment"""
+    return [name for name in BACKENDS if name == "pillow" or np is not None]
+
+def make_backend(name):
+    """Instantiate a backend by name ("auto" reads the saved benchmark)"""
+    if name == "auto":
+        try:
+            with open(DEFAULT_RESULTS) as f:
+                name = json.load(f)["fastest"]
+        except (OSError, ValueError, KeyError):
+            name = "pillow"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown resampler: {name} (expected one of {', '.join(BACKENDS)} or auto)")
+    if name not in available_backends():
+        raise ValueError(f"Resampler {name} needs NumPy, which is not installed")
+    return BACKENDS[name]()
+
+def set_backend(name):
+    """Select the backend used by resize()"""
+    global _backend
+    _backend = make_backend(name)
+    return _backend
+
+def get_backend():
+    """The current backend, from KANSYL_RESAMPLER on first use"""
+    if _backend is None:
+        set_backend(os.environ.get("KANSYL_RESAMPLER", "pillow"))
+    return _backend
+
+def resize(img, size):
+    """Resample an image to size (width, height) with the current backend"""
+    return get_backend().resize(img, size)
+
+def benchmark_matrix():
+    """(label, target size) pairs for every app icon and logo output size"""
+    from resize_app_icon import ICON_CONFIGS
+    sizes = [("icon", int(c["size"] * c["scale"])) for c in ICON_CONFIGS]
+    sizes += [("logo", 40 * scale) for scale in (1, 2, 3)]
+    return sorted(set(sizes), key=lambda item: (item[0], item[1]))
+
+def benchmark(source, names, repeats=5):
+    """Best-of-repeats time of each backend over the whole size matrix
+
+    Returns {name: {"total_ms", "per_size": {size: ms}, "max_diff"}} where
+    max_diff is the largest channel difference from Pillow's output.
+    """
+    img = Image.open(source)
+    img.load()
+    img = img.convert('RGBA')
+    matrix = benchmark_matrix()
+    reference = {size: PillowBackend().resize(img, (size, size)) for _, size in matrix}
+
+    results = {}
+    for name in names:
+        backend = make_backend(name)
+        # Warm up: builds the cached filter matrices and thread pool
+        for _, size in matrix:
+            backend.resize(img, (size, size))
+        per_size = {}
+        max_diff = 0
+        for label, size in matrix:
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                out = backend.resize(img, (size, size))
+                times.append((time.perf_counter() - start) * 1000)
+            per_size[f"{label} {size}"] = min(times)
+            if np is not None:
+                diff = np.abs(np.asarray(out, dtype=np.int16) - np.asarray(reference[size], dtype=np.int16))
+                max_diff = max(max_diff, int(diff.max()))
+        results[name] = {"total_ms": sum(per_size.values()), "per_size": per_size, "max_diff": max_diff}
+    return results
+
+def main():
+    """Benchmark the available backends on the icon and logo size matrix"""
+    parser = argparse.ArgumentParser(description="Compare resampling backends")
+    parser.add_argument("--source", default=str(DEFAULT_SOURCE), help="Master image to downscale")
+    parser.add_argument("--backend", action="append", default=[],
+                        help="Backend to include (repeatable; default: all available)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per size (default: 5)")
+    parser.add_argument("--save", action="store_true",
+                        help=f"Remember the fastest backend for KANSYL_RESAMPLER=auto ({DEFAULT_RESULTS})")
+    args = parser.parse_args()
+
+    names = args.backend or available_backends()
+    if np is None:
+        print("⚠️  NumPy is not installed; only the Pillow backend is available")
+    results = benchmark(args.source, names, args.repeats)
+
+    sizes = list(next(iter(results.values()))["per_size"])
+    print(f"⏱  Resampling {args.source} (best of {args.repeats}, ms)\n")
+    print(f"{'size':<10}" + "".join(f"{name:>16}" for name in names))
+    for size in sizes:
+        print(f"{size:<10}" + "".join(f"{results[name]['per_size'][size]:>16.2f}" for name in names))
+    print(f"{'total':<10}" + "".join(f"{results[name]['total_ms']:>16.2f}" for name in names))
+    print(f"{'max Δ':<10}" + "".join(f"{results[name]['max_diff']:>16}" for name in names))
+
+    fastest = min(names, key=lambda name: results[name]["total_ms"])
+    print(f"\n🏁 Fastest here: {fastest}")
+    if args.save:
+        DEFAULT_RESULTS.parent.mkdir(parents=True, exist_ok=True)
+        with open(DEFAULT_RESULTS, 'w') as f:
+            json.dump({
+                "fastest": fastest,
+                "cpus": os.cpu_count(),
+                "platform": sys.platform,
+                "totals_ms": {name: results[name]["total_ms"] for name in names},
+            }, f, indent=2)
+        print(f"💾 Saved; KANSYL_RESAMPLER=auto will use {fastest}")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ Takes a source image and generates all required iOS app icon sizes
 import os
 import json
 import sys
+import hashlib
 from pathlib import Path
 
 # Check if Pillow is installed
@@ -18,33 +19,141 @@ except ImportError:
     os.system("pip3 install Pillow")
     from PIL import Image
 
-def resize_icon(source_image_path, size, output_path):
-    """Resize the source image to the specified size"""
+from artifact_cache import cache_key, default_cache, encode_png, file_digest, write_output
+from color_management import load_master, to_working_space, transform_stats
+from resampling import get_backend, resize
+from safe_decode import DecodeRejected, SandboxedDecoder
+
+# Icon configurations for iOS
+ICON_CONFIGS = [
+    # iPhone icons
+    {"size": 20, "scale": 2, "idiom": "iphone"},
+    {"size": 20, "scale": 3, "idiom": "iphone"},
+    {"size": 29, "scale": 2, "idiom": "iphone"},
+    {"size": 29, "scale": 3, "idiom": "iphone"},
+    {"size": 40, "scale": 2, "idiom": "iphone"},
+    {"size": 40, "scale": 3, "idiom": "iphone"},
+    {"size": 60, "scale": 2, "idiom": "iphone"},
+    {"size": 60, "scale": 3, "idiom": "iphone"},
+    # iPad icons
+    {"size": 20, "scale": 1, "idiom": "ipad"},
+    {"size": 20, "scale": 2, "idiom": "ipad"},
+    {"size": 29, "scale": 1, "idiom": "ipad"},
+    {"size": 29, "scale": 2, "idiom": "ipad"},
+    {"size": 40, "scale": 1, "idiom": "ipad"},
+    {"size": 40, "scale": 2, "idiom": "ipad"},
+    {"size": 76, "scale": 1, "idiom": "ipad"},
+    {"size": 76, "scale": 2, "idiom": "ipad"},
+    {"size": 83.5, "scale": 2, "idiom": "ipad"},
+    # App Store icon
+    {"size": 1024, "scale": 1, "idiom": "ios-marketing"},
+]
+
+def icon_filename(config):
+    """Filename for an icon configuration"""
+    size = config["size"]
+    scale = config["scale"]
+    if size == 83.5:
+        return f"icon-83.5x83.5@{scale}x.png"
+    return f"icon-{int(size)}x{int(size)}@{scale}x.png"
+
+def icon_contents_entry(config):
+    """Contents.json entry for an icon configuration"""
+    size = config["size"]
+    return {
+        "filename": icon_filename(config),
+        "idiom": config["idiom"],
+        "scale": f"{config['scale']}x",
+        "size": f"{int(size) if size % 1 == 0 else size}x{int(size) if size % 1 == 0 else size}"
+    }
+
+def prepare_icon(img, size):
+    """Resize an opened source image to one square icon size"""
+    icc_profile = img.info.get("icc_profile")
+    
+    # Convert to RGBA if not already
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    
+    # Resize with Lanczos resampling (backend chosen by KANSYL_RESAMPLER)
+    resized = resize(img, (size, size))
+    
+    # For the App Store icon (1024x1024), remove alpha channel
+    if size == 1024:
+        # Create a white background
+        background = Image.new('RGB', (size, size), (255, 255, 255))
+        # Paste the image on the white background
+        if resized.mode == 'RGBA':
+            background.paste(resized, (0, 0), resized)
+            resized = background
+        else:
+            resized = resized.convert('RGB')
+    
+    # Keep a wide-gamut profile from color management in the output
+    if icc_profile:
+        resized.info["icc_profile"] = icc_profile
+    
+    return resized
+
+def resized_icon_png(source_image_path, size, cache=None, color_space="srgb", decoder=None):
+    """PNG bytes of the source image resized to one icon size
+
+    The source is decoded in a sandbox (see load_master) and converted from
+    its embedded ICC profile to color_space ("srgb" or "display-p3") once
+    per file, not once per size. Raises DecodeRejected for unsafe input.
+    Returns (data, cached).
+    """
+    # Reuse a previous resize of the same source image if one is cached
+    key = None
+    if cache is not None:
+        key = _icon_cache_key(file_digest(source_image_path), size, color_space)
+        data = cache.get(key)
+        if data is not None:
+            return data, True
+    
+    # Decode the source image in the working color space
+    master = load_master(source_image_path, color_space, decoder=decoder)
+    return _encode_icon(master, size, cache, key), False
+
+def _icon_cache_key(source_digest, size, color_space):
+    return cache_key([__file__, Path(__file__).with_name("color_management.py"),
+                      Path(__file__).with_name("resampling.py")],
+                     source=source_digest, size=size,
+                     color_space=color_space, resampler=get_backend().name)
+
+def resized_master_png(master, source_digest, size, cache=None, color_space="srgb"):
+    """PNG bytes of an already decoded master resized to one icon size
+
+    master must already be in color_space (see to_working_space);
+    source_digest is the SHA-256 of the bytes it was decoded from.
+    Returns (data, cached).
+    """
+    key = None
+    if cache is not None:
+        key = _icon_cache_key(source_digest, size, color_space)
+        data = cache.get(key)
+        if data is not None:
+            return data, True
+    return _encode_icon(master, size, cache, key), False
+
+def _encode_icon(master, size, cache, key):
+    """Resize and encode after a cache miss, storing the result under key"""
+    data = encode_png(prepare_icon(master, size), optimize=True, quality=100)
+    if cache is not None:
+        cache.put(key, data)
+    return data
+
+def resize_icon(master, source_digest, size, output_path, cache=None, color_space="srgb"):
+    """Resize the decoded source image to the specified size"""
     try:
-        # Open the source image
-        img = Image.open(source_image_path)
-        
-        # Convert to RGBA if not already
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        
-        # Resize using high-quality Lanczos resampling
-        resized = img.resize((size, size), Image.Resampling.LANCZOS)
-        
-        # For the App Store icon (1024x1024), remove alpha channel
-        if size == 1024:
-            # Create a white background
-            background = Image.new('RGB', (size, size), (255, 255, 255))
-            # Paste the image on the white background
-            if resized.mode == 'RGBA':
-                background.paste(resized, (0, 0), resized)
-                resized = background
-            else:
-                resized = resized.convert('RGB')
+        data, cached = resized_master_png(master, source_digest, size, cache, color_space)
         
         # Save the resized image
-        resized.save(output_path, 'PNG', optimize=True, quality=100)
-        print(f"✓ Created: {output_path} ({size}x{size})")
+        write_output(output_path, data)
+        if cached:
+            print(f"✓ Restored: {output_path} ({size}x{size}, cached)")
+        else:
+            print(f"✓ Created: {output_path} ({size}x{size})")
         return True
     except Exception as e:
         print(f"✗ Error creating {output_path}: {str(e)}")
@@ -56,22 +165,29 @@ def main():
     # Check if source image path is provided
     if len(sys.argv) < 2:
         print("❌ Please provide the path to your source icon image")
-        print("Usage: python3 resize_app_icon.py /path/to/your/icon.png")
+        print("Usage: python3 resize_app_icon.py /path/to/your/icon.png [--yes] [--display-p3]")
         sys.exit(1)
     
     source_image_path = sys.argv[1]
+    color_space = "display-p3" if "--display-p3" in sys.argv else "srgb"
     
     # Check if source image exists
     if not os.path.exists(source_image_path):
         print(f"❌ Source image not found: {source_image_path}")
         sys.exit(1)
     
-    # Verify source image
+    # Read the source once and decode it only in the sandbox; the decoded
+    # image is what gets resized, so the file is never opened here again
     try:
-        img = Image.open(source_image_path)
+        with SandboxedDecoder(1) as decoder:
+            with open(source_image_path, 'rb') as f:
+                source_data = f.read(decoder.limits.max_bytes + 1)
+            img = decoder.decode(source_data, source_image_path)
         width, height = img.size
         print(f"📱 Source image: {source_image_path}")
         print(f"   Size: {width}x{height}")
+        print(f"   Color: {'embedded ICC profile' if img.info.get('icc_profile') else 'untagged (treated as sRGB)'}"
+              f" → {color_space}")
         
         # Recommend square image
         if width != height:
@@ -80,14 +196,23 @@ def main():
         # Recommend minimum size
         if width < 1024 or height < 1024:
             print(f"⚠️  Warning: Source image is smaller than 1024x1024. Quality may be reduced.")
-            response = input("Continue anyway? (y/n): ")
-            if response.lower() != 'y':
-                print("Exiting...")
-                sys.exit(0)
+            # Only ask when someone is there to answer (not in CI or a pipeline)
+            if sys.stdin.isatty() and "--yes" not in sys.argv:
+                response = input("Continue anyway? (y/n): ")
+                if response.lower() != 'y':
+                    print("Exiting...")
+                    sys.exit(0)
+    except DecodeRejected as e:
+        print(f"❌ Source image rejected: {e.reason}")
+        print(f"   Quarantined as: {e.quarantined}")
+        sys.exit(1)
     except Exception as e:
         print(f"❌ Error opening source image: {str(e)}")
         sys.exit(1)
     
+    source_digest = hashlib.sha256(source_data).hexdigest()
+    master = to_working_space(img, color_space)
+    
     # Define the output directory
     base_dir = Path(__file__).parent.parent
     assets_dir = base_dir / "kansyl" / "Assets.xcassets" / "AppIcon.appiconset"
@@ -102,31 +227,6 @@ def main():
     # Create assets directory if it doesn't exist
     assets_dir.mkdir(parents=True, exist_ok=True)
     
-    # Icon configurations for iOS
-    icon_configs = [
-        # iPhone icons
-        {"size": 20, "scale": 2, "idiom": "iphone"},
-        {"size": 20, "scale": 3, "idiom": "iphone"},
-        {"size": 29, "scale": 2, "idiom": "iphone"},
-        {"size": 29, "scale": 3, "idiom": "iphone"},
-        {"size": 40, "scale": 2, "idiom": "iphone"},
-        {"size": 40, "scale": 3, "idiom": "iphone"},
-        {"size": 60, "scale": 2, "idiom": "iphone"},
-        {"size": 60, "scale": 3, "idiom": "iphone"},
-        # iPad icons
-        {"size": 20, "scale": 1, "idiom": "ipad"},
-        {"size": 20, "scale": 2, "idiom": "ipad"},
-        {"size": 29, "scale": 1, "idiom": "ipad"},
-        {"size": 29, "scale": 2, "idiom": "ipad"},
-        {"size": 40, "scale": 1, "idiom": "ipad"},
-        {"size": 40, "scale": 2, "idiom": "ipad"},
-        {"size": 76, "scale": 1, "idiom": "ipad"},
-        {"size": 76, "scale": 2, "idiom": "ipad"},
-        {"size": 83.5, "scale": 2, "idiom": "ipad"},
-        # App Store icon
-        {"size": 1024, "scale": 1, "idiom": "ios-marketing"},
-    ]
-    
     # Generate Contents.json
     contents = {
         "images": [],
@@ -141,24 +241,16 @@ def main():
     
     successful = 0
     failed = 0
+    cache = default_cache()
     
-    for config in icon_configs:
-        size = config["size"]
-        scale = config["scale"]
-        idiom = config["idiom"]
-        
+    for config in ICON_CONFIGS:
         # Calculate actual pixel size
-        actual_size = int(size * scale)
-        
-        # Generate filename
-        if size == 83.5:
-            filename = f"icon-83.5x83.5@{scale}x.png"
-        else:
-            filename = f"icon-{int(size)}x{int(size)}@{scale}x.png"
+        actual_size = int(config["size"] * config["scale"])
+        filename = icon_filename(config)
         
         # Resize and save the icon
         output_path = assets_dir / filename
-        success = resize_icon(source_image_path, actual_size, output_path)
+        success = resize_icon(master, source_digest, actual_size, output_path, cache, color_space)
         
         if success:
             successful += 1
@@ -166,12 +258,7 @@ def main():
             failed += 1
         
         # Add to Contents.json
-        contents["images"].append({
-            "filename": filename,
-            "idiom": idiom,
-            "scale": f"{scale}x",
-            "size": f"{int(size) if size % 1 == 0 else size}x{int(size) if size % 1 == 0 else size}"
-        })
+        contents["images"].append(icon_contents_entry(config))
     
     # Write Contents.json
     contents_path = assets_dir / "Contents.json"
@@ -182,6 +269,10 @@ def main():
     print(f"   ✅ Successfully generated: {successful} icons")
     if failed > 0:
         print(f"   ❌ Failed: {failed} icons")
+    if cache is not None:
+        print(f"   {cache.summary()}")
+    stats = transform_stats()
+    print(f"   🎨 Color transforms: {stats['transform_builds']} built, {stats['transform_hits']} reused")
     
     print(f"\n📁 All icons saved to: {assets_dir}")
     print(f"📄 Contents.json updated")
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Sandboxed image decoding for untrusted Kansyl artwork
+Downloaded images are decoded in worker subprocesses with limits on CPU
+time, memory and pixel count, so a decompression bomb, a pathological file
+or a decoder crash costs one worker instead of the whole asset run
+
+Workers are recycled after a number of images, after any failure and when
+their peak memory gets too high. Inputs that are rejected or take a worker
+down are copied to .asset_cache/quarantine/ with a note of why.
+
+Check files by hand:
+
+    python3 Scripts/safe_decode.py Resources/*.png
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from pathlib import Path
+
+# resource is POSIX-only; elsewhere only the wall-clock timeout applies
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Check if Pillow is installed
+try:
+    from PIL import Image, UnidentifiedImageError
+except ImportError:
+    print("❌ Pillow is not installed. Installing...")
+    os.system("pip3 install Pillow")
+    from PIL import Image, UnidentifiedImageError
+
+BASE_DIR = Path(__file__).parent.parent
+DEFAULT_QUARANTINE = BASE_DIR / ".asset_cache" / "quarantine"
+
+# Formats accepted as source artwork; anything else is rejected before decoding
+ALLOWED_FORMATS = ["PNG", "JPEG", "WEBP", "TIFF", "GIF", "BMP"]
+
+class DecodeLimits:
+    """Per-image resource limits for sandboxed decoding"""
+
+    def __init__(self, max_pixels=64_000_000, max_bytes=64 * 1024 * 1024,
+                 cpu_seconds=10, max_memory_mb=1024, images_per_worker=50):
+        # 64 megapixels is an 8000x8000 master, far beyond any icon source
+        self.max_pixels = max_pixels
+        self.max_bytes = max_bytes
+        self.cpu_seconds = cpu_seconds
+        self.max_memory_mb = max_memory_mb
+        self.images_per_worker = images_per_worker
+
+    @property
+    def wall_seconds(self):
+        """How long to wait for a worker before killing it"""
+        return self.cpu_seconds * 2 + 5
+
+class DecodeRejected(Exception):
+    """An input was refused or took down its worker; it has been quarantined"""
+
+    def __init__(self, label, reason, quarantined=None):
+        super().__init__(f"{label}: {reason}")
+        self.label = label
+        self.reason = reason
+        self.quarantined = quarantined
+
+def _cpu_used():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def _peak_memory_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _unidentified_reason(data):
+    """Explain bytes that no allowed decoder recognised"""
+    head = data[:64].lstrip().lower()
+    if head.startswith((b"<?xml", b"<!doctype", b"<html", b"{")):
+        return "not an image but a text document (an error page saved as an image?)"
+    return f"not a {', '.join(ALLOWED_FORMATS)} image"
+
+def _decode(data, limits):
+    """Decode one image after checking its header against the limits"""
+    try:
+        img = Image.open(io.BytesIO(data), formats=ALLOWED_FORMATS)
+    except UnidentifiedImageError:
+        raise ValueError(_unidentified_reason(data))
+    with img:
+        width, height = img.size
+        if width * height > limits.max_pixels:
+            raise ValueError(f"{width}x{height} exceeds the {limits.max_pixels:,} pixel limit")
+        img.load()
+        icc_profile = img.info.get("icc_profile")
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'CMYK'):
+            img = img.convert('RGBA')
+        return {
+            "mode": img.mode,
+            "size": img.size,
+            "pixels": img.tobytes(),
+            "icc_profile": icc_profile,
+        }
+
+def _worker_main(conn, limits):
+    """Decode loop of one worker process"""
+    # Pillow's own bomb check, in case a decoder grows the image after open
+    Image.MAX_IMAGE_PIXELS = limits.max_pixels
+    if resource is not None:
+        memory = limits.max_memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        except (ValueError, OSError):
+            # Not enforceable on macOS; the peak memory check still applies
+            pass
+
+    while True:
+        try:
+            data = conn.recv_bytes()
+        except EOFError:
+            break
+        if resource is not None:
+            # RLIMIT_CPU counts the whole process, so move the limit to
+            # this image's budget; going over it kills the worker (SIGXCPU)
+            cpu_limit = int(_cpu_used() + limits.cpu_seconds) + 1
+            _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, hard))
+        try:
+            result = ("ok", _decode(data, limits))
+        except MemoryError:
+            result = ("error", "ran out of memory")
+        except Exception as e:
+            result = ("error", str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}")
+        peak = _peak_memory_mb() if resource is not None else 0
+        conn.send((*result, peak))
+
+class _Worker:
+    def __init__(self, context, limits):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, limits), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.decoded = 0
+
+    def stop(self):
+        try:
+            self.conn.close()
+        finally:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join()
+
+class SandboxedDecoder:
+    """Pool of decode worker processes, safe to call from many threads"""
+
+    def __init__(self, workers=2, limits=None, quarantine_dir=DEFAULT_QUARANTINE):
+        self.limits = limits or DecodeLimits()
+        self.quarantine_dir = Path(quarantine_dir)
+        # Spawned workers don't inherit the pipeline's threads or open files
+        self.context = multiprocessing.get_context("spawn")
+        self.idle = []
+        self.slots = threading.Semaphore(workers)
+        self.lock = threading.Lock()
+        self.stats = {"decoded": 0, "rejected": 0, "killed": 0, "recycled": 0}
+        self.quarantined = []
+
+    def _checkout(self):
+        self.slots.acquire()
+        with self.lock:
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.stop()
+        return _Worker(self.context, self.limits)
+
+    def _checkin(self, worker, recycle):
+        if recycle or worker.decoded >= self.limits.images_per_worker:
+            worker.stop()
+            with self.lock:
+                self.stats["recycled"] += 1
+        else:
+            with self.lock:
+                self.idle.append(worker)
+        self.slots.release()
+
+    def _quarantine(self, data, label, reason):
+        """Keep a rejected input and why it was rejected; returns its path"""
+        digest = hashlib.sha256(data).hexdigest()
+        self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        path = self.quarantine_dir / f"{digest}.bin"
+        if not path.exists():
+            path.write_bytes(data)
+        with open(path.with_suffix(".json"), 'w') as f:
+            json.dump({"label": label, "reason": reason, "bytes": len(data),
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, indent=2)
+        with self.lock:
+            self.stats["rejected"] += 1
+            self.quarantined.append((label, reason, str(path)))
+        return path
+
+    def _reject(self, data, label, reason):
+        raise DecodeRejected(label, reason, self._quarantine(data, label, reason))
+
+    def decode(self, data, label="image"):
+        """Decode untrusted bytes into a Pillow image, or raise DecodeRejected"""
+        if len(data) > self.limits.max_bytes:
+            self._reject(data, label, f"{len(data):,} bytes exceeds the {self.limits.max_bytes:,} byte limit")
+
+        worker = self._checkout()
+        recycle = True
+        try:
+            try:
+                worker.conn.send_bytes(data)
+            except OSError:
+                # An idle worker died between checks; this input isn't to blame
+                worker.stop()
+                worker = _Worker(self.context, self.limits)
+                worker.conn.send_bytes(data)
+            if not worker.conn.poll(self.limits.wall_seconds):
+                with self.lock:
+                    self.stats["killed"] += 1
+                self._reject(data, label, f"no result after {self.limits.wall_seconds}s")
+            try:
+                status, result, peak_mb = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(1)
+                with self.lock:
+                    self.stats["killed"] += 1
+                self._reject(data, label, f"worker died (exit code {worker.process.exitcode})")
+            worker.decoded += 1
+            if status != "ok":
+                self._reject(data, label, result)
+            recycle = peak_mb > self.limits.max_memory_mb * 0.75
+        finally:
+            self._checkin(worker, recycle)
+
+        img = Image.frombytes(result["mode"], result["size"], result["pixels"])
+        if result["icc_profile"]:
+            img.info["icc_profile"] = result["icc_profile"]
+        with self.lock:
+            self.stats["decoded"] += 1
+        return img
+
+    def decode_file(self, path):
+        """Read and decode a file"""
+        with open(path, 'rb') as f:
+            return self.decode(f.read(self.limits.max_bytes + 1), str(path))
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for worker in idle:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summary(self):
+        s = self.stats
+        return (f"🛡  Sandboxed decode: {s['decoded']} decoded, {s['rejected']} quarantined, "
+                f"{s['killed']} workers killed, {s['recycled']} recycled")
+
+def add_limit_arguments(parser):
+    """Decode limit options shared by the scripts that read untrusted images"""
+    defaults = DecodeLimits()
+    parser.add_argument("--max-pixels", type=int, default=defaults.max_pixels,
+                        help=f"Largest accepted image in pixels (default: {defaults.max_pixels:,})")
+    parser.add_argument("--decode-cpu-seconds", type=int, default=defaults.cpu_seconds,
+                        help=f"CPU time allowed per image (default: {defaults.cpu_seconds})")
+    parser.add_argument("--decode-memory-mb", type=int, default=defaults.max_memory_mb,
+                        help=f"Memory allowed per decode worker (default: {defaults.max_memory_mb})")
+
+def limits_from_args(args):
+    return DecodeLimits(max_pixels=args.max_pixels, cpu_seconds=args.decode_cpu_seconds,
+                        max_memory_mb=args.decode_memory_mb)
+
+def main():
+    """Decode files in the sandbox and report which would be quarantined"""
+    parser = argparse.ArgumentParser(description="Check images with the sandboxed decoder")
+    parser.add_argument("files", nargs="+", help="Images to check")
+    parser.add_argument("--workers", type=int, default=2)
+    add_limit_arguments(parser)
+    args = parser.parse_args()
+
+    failed = 0
+    with SandboxedDecoder(args.workers, limits_from_args(args)) as decoder:
+        for path in args.files:
+            try:
+                img = decoder.decode_file(path)
+                print(f"✓ {path}: {img.width}x{img.height} {img.mode}")
+            except DecodeRejected as e:
+                failed += 1
+                print(f"✗ {path}: {e.reason}")
+                print(f"   quarantined as {e.quarantined}")
+        print(decoder.summary())
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()